@@ -0,0 +1,105 @@
+"""Measure GET /api/quiz/questions latency during a login surge, with and without admission control.
+
+Usage: python benchmarks/bench_admission.py [--logins 16] [--duration 10] [--auth-limit 2]
+
+Login clients hash inline (PASSWORD_HASH_WORKERS=0) so each login holds a
+request thread for a full scrypt check, as a saturated hashing pool would.
+One reader polls the questions endpoint throughout. With admission
+control the auth class is capped at --auth-limit running logins; the rest
+wait briefly and are then shed with 503.
+"""
+import argparse
+import collections
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = 'benchmark-password'
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else 0
+
+
+def run(app, logins, duration):
+    statuses = collections.Counter()
+    read_latencies = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def login_client(index):
+        test_client = app.test_client()
+        credentials = {'email': f'bench{index}@example.com', 'password': PASSWORD}
+        local = collections.Counter()
+        while time.perf_counter() < stop_at:
+            response = test_client.post('/api/auth/login', json=credentials)
+            local[response.status_code] += 1
+            if response.status_code == 503:
+                # A real client would honour Retry-After; keep the pressure on but don't spin
+                time.sleep(0.05)
+        with lock:
+            statuses.update(local)
+
+    def reader():
+        test_client = app.test_client()
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            test_client.get('/api/quiz/questions')
+            read_latencies.append(time.perf_counter() - started)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login_client, args=(i,)) for i in range(logins)]
+    threads.append(threading.Thread(target=reader))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    read_latencies.sort()
+    return statuses, read_latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=16, help='Concurrent login clients (threads)')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per run')
+    parser.add_argument('--auth-limit', type=int, default=2, help='Running logins allowed with admission control')
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix='bench-admission-')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(db_dir, "bench.db")}'
+    os.environ['PASSWORD_HASH_WORKERS'] = '0'
+    os.environ['RATELIMIT_ENABLED'] = 'false'
+    os.environ['ADMISSION_LIMITS'] = f'auth={args.auth_limit}'
+
+    from main import create_app, init_database, warm_caches
+    from models.user import User, db
+    from services.password_hashing import password_hasher
+
+    for enabled in ('false', 'true'):
+        os.environ['ADMISSION_CONTROL_ENABLED'] = enabled
+        app = create_app()
+        if enabled == 'false':
+            init_database(app)
+            with app.app_context():
+                password_hash = password_hasher.hash(PASSWORD)
+                db.session.execute(db.insert(User), [
+                    {'name': f'Bench User {i}', 'email': f'bench{i}@example.com', 'password_hash': password_hash}
+                    for i in range(args.logins)
+                ])
+                db.session.commit()
+        warm_caches(app)
+
+        statuses, read_latencies = run(app, args.logins, args.duration)
+        label = f'admission control (auth={args.auth_limit})' if enabled == 'true' else 'no admission control'
+        print(f'{label}:')
+        print(f'  questions p50 / p99: {percentile(read_latencies, 0.5):.1f} ms / '
+              f'{percentile(read_latencies, 0.99):.1f} ms over {len(read_latencies)} reads')
+        print(f'  logins/sec: {statuses[200] / args.duration:.1f}  statuses: {dict(statuses)}')
+
+
+if __name__ == '__main__':
+    main()
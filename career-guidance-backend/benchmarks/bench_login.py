@@ -0,0 +1,93 @@
+"""Measure sustained POST /api/auth/login throughput on one node.
+
+Usage: python benchmarks/bench_login.py [--clients 16] [--duration 10] [--hash-workers 4]
+
+--hash-workers 0 hashes inline in the request threads (the old behaviour);
+any other value uses the password hashing process pool.
+"""
+import argparse
+import collections
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = 'benchmark-password'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent login clients (threads)')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds to run')
+    parser.add_argument('--hash-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--queue-size', type=int, default=0, help='Pending hash jobs before 503 (default: 4 x workers)')
+    parser.add_argument('--method', help='PASSWORD_HASH_METHOD, e.g. scrypt:16384:8:1')
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix='bench-login-')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(db_dir, "bench.db")}'
+    os.environ['PASSWORD_HASH_WORKERS'] = str(args.hash_workers)
+    os.environ['PASSWORD_HASH_QUEUE_SIZE'] = str(args.queue_size)
+    if args.method:
+        os.environ['PASSWORD_HASH_METHOD'] = args.method
+
+    os.environ['RATELIMIT_ENABLED'] = 'false'
+
+    from main import create_app, init_database
+    from models.user import User, db
+    from services.password_hashing import password_hasher
+    app = create_app()
+    init_database(app)
+
+    with app.app_context():
+        password_hash = password_hasher.hash(PASSWORD)
+        db.session.execute(db.insert(User), [
+            {'name': f'Bench User {i}', 'email': f'bench{i}@example.com', 'password_hash': password_hash}
+            for i in range(args.clients)
+        ])
+        db.session.commit()
+
+    statuses = collections.Counter()
+    latencies = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(args.clients + 1)
+    stop_at = [0.0]
+
+    def client(index):
+        test_client = app.test_client()
+        credentials = {'email': f'bench{index}@example.com', 'password': PASSWORD}
+        local_statuses = collections.Counter()
+        local_latencies = []
+        start_barrier.wait()
+        while time.perf_counter() < stop_at[0]:
+            started = time.perf_counter()
+            response = test_client.post('/api/auth/login', json=credentials)
+            local_latencies.append(time.perf_counter() - started)
+            local_statuses[response.status_code] += 1
+        with lock:
+            statuses.update(local_statuses)
+            latencies.extend(local_latencies)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    stop_at[0] = time.perf_counter() + args.duration
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+    password_hasher.shutdown()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+    print(f'hash workers: {args.hash_workers}  clients: {args.clients}  method: {password_hasher.method}')
+    print(f'logins/sec:   {statuses[200] / args.duration:.1f}')
+    print(f'p50 / p99:    {p50 * 1000:.0f} ms / {p99 * 1000:.0f} ms')
+    print(f'statuses:     {dict(statuses)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Measure per-check overhead of the rate limit storages and node-wide enforcement.
+
+Usage: python benchmarks/bench_rate_limit_storage.py [--checks 20000] [--keys 1000] [--processes 4]
+
+Times one limiter hit (the work Flask-Limiter does per request) for the
+in-memory storage and the shared SQLite storage under each strategy, then
+has several processes hit one key of the shared storage at once to show
+the limit is enforced once per node rather than once per process.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import STRATEGIES
+import services.rate_limit_storage  # noqa: F401  (registers shared://)
+
+
+def time_checks(uri, strategy, checks, keys):
+    storage = storage_from_string(uri)
+    storage.reset()
+    limiter = STRATEGIES[strategy](storage)
+    # Generous enough that every check is counted, as for ordinary traffic
+    item = parse('1000000 per hour')
+    started = time.perf_counter()
+    for i in range(checks):
+        limiter.hit(item, f'10.0.{i % keys // 256}.{i % keys % 256}')
+    return (time.perf_counter() - started) / checks * 1e6
+
+
+def contend(uri, strategy, limit, attempts, results):
+    limiter = STRATEGIES[strategy](storage_from_string(uri))
+    item = parse(f'{limit} per minute')
+    results.put(sum(limiter.hit(item, 'shared-client') for _ in range(attempts)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--checks', type=int, default=20000, help='Limiter hits timed per storage and strategy')
+    parser.add_argument('--keys', type=int, default=1000, help='Distinct client keys the hits are spread over')
+    parser.add_argument('--processes', type=int, default=4, help='Processes hitting one shared key at once')
+    parser.add_argument('--limit', type=int, default=500, help='Per-minute limit of the shared key')
+    args = parser.parse_args()
+
+    shared_uri = f'shared://{os.path.join(tempfile.mkdtemp(prefix="bench-ratelimit-"), "rate_limits.db")}'
+    print(f'{"strategy":<24}{"memory":>12}{"shared":>12}')
+    for strategy in STRATEGIES:
+        memory = time_checks('memory://', strategy, args.checks, args.keys)
+        shared = time_checks(shared_uri, strategy, args.checks, args.keys)
+        print(f'{strategy:<24}{memory:>9.1f} us{shared:>9.1f} us')
+
+    print(f'\n{args.processes} processes x {args.limit} hits on one key, limit {args.limit} per minute:')
+    context = multiprocessing.get_context('spawn')
+    for strategy in STRATEGIES:
+        storage_from_string(shared_uri).reset()
+        results = context.Queue()
+        workers = [context.Process(target=contend, args=(shared_uri, strategy, args.limit, args.limit, results))
+                   for _ in range(args.processes)]
+        for worker in workers:
+            worker.start()
+        allowed = sum(results.get() for _ in workers)
+        for worker in workers:
+            worker.join()
+        print(f'  {strategy:<24} {allowed} allowed (per-process memory storage: {args.limit * args.processes})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark the vectorized scoring engine against the original per-user loop.
+
+Usage: python benchmarks/bench_scoring.py [--users 20000] [--seed 7]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.career_catalog import load_catalog
+
+QUESTION_OPTIONS = [
+    ['analytical', 'creative', 'social', 'practical'],
+    ['team', 'independent', 'leadership', 'structured'],
+    ['stem', 'humanities', 'arts', 'business'],
+    ['communication', 'technical', 'creativity', 'organization'],
+    ['office', 'remote', 'outdoors', 'laboratory'],
+    ['impact', 'growth', 'stability', 'innovation'],
+]
+
+
+def reference_recommendations(careers, answers):
+    """The original nested-loop algorithm, kept here as the parity oracle"""
+    career_scores = []
+    for career, weights in careers.items():
+        score = 0
+        max_score = 0
+        match_count = 0
+        for trait, weight in weights.items():
+            if trait in ['description', 'details']:
+                continue
+            max_score += weight * 3
+            for answer_id, answer_value in answers.items():
+                if answer_value == trait:
+                    score += weight * 3
+                    match_count += 1
+                elif trait in str(answer_value):
+                    score += weight * 1.5
+                    match_count += 0.5
+        if match_count >= 3:
+            score *= 1.2
+        elif match_count >= 2:
+            score *= 1.1
+        if max_score > 0:
+            percentage_score = min(100, (score / max_score) * 100)
+        else:
+            percentage_score = 50
+        if percentage_score < 30:
+            percentage_score = max(30, percentage_score + (match_count * 5))
+        career_scores.append({'career': career, 'score': round(percentage_score, 1)})
+    career_scores.sort(key=lambda x: x['score'], reverse=True)
+    return career_scores[:8]
+
+
+def random_answers(rng):
+    answers = {}
+    for question_id, options in enumerate(QUESTION_OPTIONS, start=1):
+        answers[str(question_id)] = rng.choice(options)
+    # Exercise the substring (partial match) path now and then
+    if rng.random() < 0.1:
+        answers['extra'] = 'analytical-' + rng.choice(QUESTION_OPTIONS[2])
+    return answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--catalog', help='Career catalog file (defaults to data/careers.json)')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    answer_sets = [random_answers(rng) for _ in range(args.users)]
+    engine = (load_catalog(args.catalog) if args.catalog else load_catalog()).engine
+    profiles = dict(zip(engine.career_names, engine.profiles))
+
+    start = time.perf_counter()
+    expected = [reference_recommendations(profiles, answers) for answers in answer_sets]
+    loop_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = engine.recommend_batch(answer_sets)
+    batch_elapsed = time.perf_counter() - start
+
+    # recommend() is the single-request path: dense or indexed by catalog size
+    start = time.perf_counter()
+    single = [engine.recommend(answers) for answers in answer_sets]
+    single_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [engine.build_recommendations(*engine.score_indexed(answers)) for answers in answer_sets]
+    indexed_elapsed = time.perf_counter() - start
+
+    mismatches = 0
+    for want, *results in zip(expected, actual, single, indexed):
+        want = [(r['career'], r['score']) for r in want]
+        if any(want != [(r['career'], r['score']) for r in result] for result in results):
+            mismatches += 1
+
+    print(f'users:        {args.users}')
+    print(f'loop:         {args.users / loop_elapsed:,.0f} users/sec')
+    print(f'batch engine: {args.users / batch_elapsed:,.0f} users/sec')
+    print(f'single:       {args.users / single_elapsed:,.0f} users/sec')
+    print(f'indexed:      {args.users / indexed_elapsed:,.0f} users/sec')
+    print(f'mismatches:   {mismatches}')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""Compare reader latency under concurrent writers with SQLite defaults and the WAL profile.
+
+Usage: python benchmarks/bench_sqlite_concurrency.py [--writers 4] [--readers 8] [--bulk-writers 1] [--duration 10]
+
+Writers loop submit + generate (each a write transaction); readers loop
+GET /api/recommendations and the admin response listing; bulk writers
+rewrite every stored recommendation in one transaction, like a batch job.
+Every worker is a forked process with its own connection, like server
+workers, and each profile runs against a fresh database. "defaults" is SQLite
+without pragmas (rollback journal, synchronous=FULL); "wal" is the engine
+profile from the SQLITE_* settings.
+"""
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROFILES = {
+    'defaults': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_CACHE_SIZE_KB': '2000',
+        'SQLITE_MMAP_SIZE': '0',
+    },
+    'wal': {},
+}
+SEED_USERS = 2000
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+def run_profile(args):
+    from main import create_app, init_database, warm_caches
+    from models.user import db
+    from seed_data import admin_count, seed_population
+
+    app = create_app()
+    init_database(app)
+    warm_caches(app)
+    with app.app_context():
+        seed_population(SEED_USERS)
+    admins = admin_count(SEED_USERS)
+
+    questions = app.test_client().get('/api/quiz/questions').get_json()
+    answer_sets = [
+        {str(q['id']): q['options'][0]['value'] for q in questions},
+        {str(q['id']): q['options'][1]['value'] for q in questions},
+    ]
+
+    def client_for(user_id, role):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+            sess['user_role'] = role
+        return client
+
+    def writer(index):
+        client = client_for(admins + 1 + index, 'student')
+        iteration = 0
+        while True:
+            for method, path, body in (
+                ('POST', '/api/quiz/responses', {'answers': answer_sets[iteration % 2]}),
+                ('POST', '/api/recommendations/generate', None),
+            ):
+                yield client.open(path, method=method, json=body)
+            iteration += 1
+
+    def reader(index):
+        student = client_for(admins + 1 + args.writers + index, 'student')
+        admin = client_for(1, 'admin')
+        while True:
+            yield student.get('/api/recommendations')
+            yield admin.get('/api/quiz/responses/all?limit=50')
+
+    def bulk_writer(index):
+        while True:
+            with app.app_context():
+                db.session.execute(db.text('UPDATE career_recommendation SET score = score + 0'))
+                db.session.commit()
+            yield None
+
+    def work(kind, requests, start_event, stop_at, results):
+        # Forked children must not reuse the parent's SQLite connections
+        with app.app_context():
+            db.engine.dispose(close=False)
+        latencies, statuses = [], collections.Counter()
+        start_event.wait()
+        while time.time() < stop_at.value:
+            started = time.perf_counter()
+            response = next(requests)
+            latencies.append(time.perf_counter() - started)
+            if response is not None:
+                statuses[response.status_code] += 1
+        results.put((kind, latencies, dict(statuses)))
+
+    context = multiprocessing.get_context('fork')
+    start_event = context.Event()
+    stop_at = context.Value('d', 0.0)
+    results = context.Queue()
+    with app.app_context():
+        db.engine.dispose()
+    processes = [context.Process(target=work, args=('writes', writer(i), start_event, stop_at, results))
+                 for i in range(args.writers)]
+    processes += [context.Process(target=work, args=('reads', reader(i), start_event, stop_at, results))
+                  for i in range(args.readers)]
+    processes += [context.Process(target=work, args=('bulk writes', bulk_writer(i), start_event, stop_at, results))
+                  for i in range(args.bulk_writers)]
+    for process in processes:
+        process.start()
+    stop_at.value = time.time() + args.duration
+    start_event.set()
+
+    stats = {'reads': [], 'writes': [], 'bulk writes': [], 'statuses': collections.Counter()}
+    for _ in processes:
+        kind, latencies, statuses = results.get()
+        stats[kind].extend(latencies)
+        stats['statuses'].update(statuses)
+    for process in processes:
+        process.join()
+
+    result = {'statuses': {str(status): count for status, count in sorted(stats['statuses'].items())}}
+    for kind in ('reads', 'writes', 'bulk writes'):
+        values = sorted(stats[kind])
+        result[kind] = {
+            'per_sec': len(values) / args.duration,
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'max_ms': (values[-1] if values else 0) * 1000,
+        }
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--bulk-writers', type=int, default=1)
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per profile')
+    parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        return run_profile(args)
+
+    for name, overrides in PROFILES.items():
+        db_dir = tempfile.mkdtemp(prefix=f'bench-sqlite-{name}-')
+        env = dict(os.environ, **overrides,
+                   DATABASE_URL=f'sqlite:///{os.path.join(db_dir, "bench.db")}',
+                   RATELIMIT_ENABLED='false', PASSWORD_HASH_WORKERS='0')
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--profile', name, '--writers', str(args.writers),
+             '--readers', str(args.readers), '--bulk-writers', str(args.bulk_writers),
+             '--duration', str(args.duration)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f'{name}:')
+        for kind in ('reads', 'writes', 'bulk writes'):
+            entry = result[kind]
+            print(f'  {kind:11s} {entry["per_sec"]:8.1f}/s  p50 {entry["p50_ms"]:7.2f} ms  '
+                  f'p99 {entry["p99_ms"]:8.2f} ms  max {entry["max_ms"]:8.2f} ms')
+        print(f'  statuses {result["statuses"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Measure how long a fresh process takes to import the app and serve its first request.
+
+Usage: python benchmarks/bench_startup.py [--runs 10]
+
+Each run is a new interpreter against an already initialized database.
+"boot with db init" is what importing main used to do in every process:
+the schema check and default-question seeding, then warm-up. "worker boot"
+is create_app, warm_caches and the first request, with no database setup.
+"forked worker" is a worker forked from a preloaded master (gunicorn
+preload_app), timed from fork to its first response.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {backend_dir!r})
+from main import create_app, init_database, warm_caches
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+if {mode!r} == 'init':
+    init_database(app)
+warm_caches(app)
+if {mode!r} == 'fork':
+    import os
+    from models.user import db
+    read_end, write_end = os.pipe()
+    forked = time.perf_counter()
+    if os.fork() == 0:
+        with app.app_context():
+            db.engine.dispose(close=False)
+        status = app.test_client().get('/api/quiz/questions').status_code
+        os.write(write_end, json.dumps([status, time.perf_counter() - forked]).encode())
+        os._exit(0)
+    os.wait()
+    status, elapsed = json.loads(os.read(read_end, 1024))
+    assert status == 200, status
+    print(json.dumps({{'import': 0, 'create_app': 0, 'ready': elapsed}}))
+else:
+    status = app.test_client().get('/api/quiz/questions').status_code
+    ready = time.perf_counter()
+    assert status == 200, status
+    print(json.dumps({{'import': imported - started, 'create_app': created - imported, 'ready': ready - started}}))
+'''
+
+
+def run_child(mode, env):
+    code = CHILD.format(backend_dir=BACKEND_DIR, mode=mode)
+    output = subprocess.run([sys.executable, '-c', code], env=env, cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix='bench-startup-')
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{os.path.join(db_dir, "bench.db")}', PASSWORD_HASH_WORKERS='0')
+    run_child('init', env)
+
+    for label, mode in (('boot with db init', 'init'), ('worker boot', 'boot'), ('forked worker', 'fork')):
+        samples = [run_child(mode, env) for _ in range(args.runs)]
+        medians = {key: statistics.median(sample[key] for sample in samples) * 1000 for key in samples[0]}
+        print(f'{label:18s} import {medians["import"]:7.1f} ms  create_app {medians["create_app"]:6.1f} ms  '
+              f'ready to serve {medians["ready"]:7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
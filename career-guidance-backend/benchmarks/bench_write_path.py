@@ -0,0 +1,104 @@
+"""Measure statements per request and sustained throughput of the quiz/recommendation write paths.
+
+Usage: python benchmarks/bench_write_path.py [--users 8] [--duration 10]
+
+Each worker thread logs in as its own user and alternates between two answer
+sets, so every submit writes and every generate has to rescore. Run it on two
+commits to compare the write paths.
+"""
+import argparse
+import collections
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=8, help='Concurrent users (threads)')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds to run')
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix='bench-write-')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(db_dir, "bench.db")}'
+    os.environ['RATELIMIT_ENABLED'] = 'false'
+
+    from sqlalchemy import event
+    from main import create_app, init_database
+    from models.user import db
+    app = create_app()
+    init_database(app)
+
+    statements = collections.Counter()
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements[threading.get_ident()] += 1
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+
+    questions = app.test_client().get('/api/quiz/questions').get_json()
+    answer_sets = [
+        {str(q['id']): q['options'][0]['value'] for q in questions},
+        {str(q['id']): q['options'][1]['value'] for q in questions},
+    ]
+
+    results = collections.defaultdict(lambda: {'requests': 0, 'statements': 0, 'errors': 0})
+    results_lock = threading.Lock()
+    start_barrier = threading.Barrier(args.users + 1)
+    stop_at = [0.0]
+
+    def worker(index):
+        client = app.test_client()
+        client.post('/api/auth/register', json={
+            'name': f'Bench User {index}',
+            'email': f'bench{index}@example.com',
+            'password': 'benchmark-password'
+        })
+        local = collections.defaultdict(lambda: {'requests': 0, 'statements': 0, 'errors': 0})
+        ident = threading.get_ident()
+        start_barrier.wait()
+        iteration = 0
+        while time.perf_counter() < stop_at[0]:
+            answers = answer_sets[iteration % 2]
+            for name, call in (
+                ('submit', lambda: client.post('/api/quiz/responses', json={'answers': answers})),
+                ('generate', lambda: client.post('/api/recommendations/generate')),
+            ):
+                before = statements[ident]
+                response = call()
+                entry = local[name]
+                entry['requests'] += 1
+                entry['statements'] += statements[ident] - before
+                if response.status_code >= 400:
+                    entry['errors'] += 1
+            iteration += 1
+        with results_lock:
+            for name, entry in local.items():
+                for key, value in entry.items():
+                    results[name][key] += value
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.users)]
+    for thread in threads:
+        thread.start()
+    stop_at[0] = time.perf_counter() + args.duration
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+
+    print(f'users: {args.users}  duration: {args.duration:.0f}s')
+    for name, entry in results.items():
+        requests = entry['requests'] or 1
+        print(
+            f'{name:9s} {entry["requests"] / args.duration:8.1f} req/s  '
+            f'{entry["statements"] / requests:5.2f} statements/req  '
+            f'{entry["errors"]} errors'
+        )
+
+
+if __name__ == '__main__':
+    main()
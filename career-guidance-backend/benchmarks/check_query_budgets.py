@@ -0,0 +1,41 @@
+"""Fail if any route issues more SQL statements than its @query_budget.
+
+Usage: python benchmarks/check_query_budgets.py
+
+Runs every route in routes/ through the Flask test client against a
+scratch SQLite database and counts the statements each request executes.
+Exits non-zero when a route exceeds or lacks a budget.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    db_dir = tempfile.mkdtemp(prefix='query-budgets-')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(db_dir, "budgets.db")}'
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+    os.environ['RATELIMIT_ENABLED'] = 'false'
+
+    from main import create_app, init_database, warm_caches
+    from query_budgets import check_query_budgets
+    app = create_app()
+    init_database(app)
+    warm_caches(app)
+
+    failures = 0
+    for endpoint, queries, budget, problem in check_query_budgets(app):
+        status = 'FAIL' if problem else 'ok'
+        print(f'[{status}] {endpoint}: {queries} queries (budget {budget})')
+        if problem:
+            print('        ' + problem.replace('\n', '\n        '))
+        failures += bool(problem)
+    if failures:
+        print(f'{failures} route checks failed')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,417 @@
+"""Drive every API endpoint concurrently and report throughput and latency percentiles.
+
+Usage:
+  python benchmarks/load_test.py [--users 10000] [--clients 16] [--duration 30] [--output load.json]
+  python benchmarks/load_test.py --database /tmp/load.db ...      # reuse a seed_data.py database
+  python benchmarks/load_test.py --url http://127.0.0.1:8000 ...  # a running server
+
+In-process runs seed a scratch database (or reuse --database) and call the
+app through the Flask test client with rate limiting off. Against --url, the
+server's database must have been seeded by seed_data.py with the same
+--users/--seed. Start the server with RATELIMIT_ENABLED=false, and without
+FLASK_ENV=production so the session cookie works over plain HTTP.
+
+Each client is a student or (one in ADMIN_CLIENT_EVERY, from the second on) an admin picking
+requests from a weighted mix. The JSON report has per-endpoint requests,
+errors, requests/sec and p50/p95/p99 latency. Pass --compare with an
+earlier report to print the change per endpoint.
+"""
+import argparse
+import collections
+import http.cookiejar
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seed_data import BASE_TIME, PASSWORD, admin_count, user_email  # noqa: E402
+
+ADMIN_CLIENT_EVERY = 8
+PAGE_SIZE = 100
+EXPORT_DAYS = 30
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, response.headers, response.get_data()
+
+
+class HttpClient:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        if data is not None:
+            request.add_header('Content-Type', 'application/json')
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read()
+
+
+class VirtualUser:
+    """One client session: a logged-in user issuing requests from a mix"""
+
+    def __init__(self, make_client, user_id, role, rng, population, shared):
+        self.make_client = make_client
+        self.client = make_client()
+        self.user_id = user_id
+        self.role = role
+        self.rng = rng
+        self.population = population
+        self.shared = shared
+        self.latencies = collections.defaultdict(list)
+        self.errors = collections.defaultdict(collections.Counter)
+        self.cursors = {}
+        self.recording = False
+
+    def call(self, name, method, path, body=None, client=None):
+        started = time.perf_counter()
+        status, headers, content = (client or self.client).request(method, path, body)
+        if self.recording:
+            self.latencies[name].append(time.perf_counter() - started)
+            if status >= 400:
+                self.errors[name][status] += 1
+        return status, headers, content
+
+    def login(self):
+        return self.call('POST /api/auth/login', 'POST', '/api/auth/login',
+                         {'email': user_email(self.user_id), 'password': PASSWORD})
+
+    def random_answers(self):
+        return {question_id: self.rng.choice(values) for question_id, values in self.shared['questions']}
+
+    def random_day(self):
+        day = BASE_TIME + timedelta(days=self.rng.randrange(EXPORT_DAYS))
+        return f'since={day.date().isoformat()}&until={(day + timedelta(days=1)).date().isoformat()}'
+
+    def page(self, name, path):
+        cursor = self.cursors.get(name)
+        query = f'?limit={PAGE_SIZE}' + (f'&cursor={cursor}' if cursor else '')
+        status, headers, _ = self.call(name, 'GET', path + query)
+        self.cursors[name] = headers.get('X-Next-Cursor') if status == 200 else None
+
+    # Student requests
+
+    def get_questions(self):
+        self.call('GET /api/quiz/questions', 'GET', '/api/quiz/questions')
+
+    def submit_response(self):
+        self.call('POST /api/quiz/responses', 'POST', '/api/quiz/responses', {'answers': self.random_answers()})
+
+    def get_responses(self):
+        self.call('GET /api/quiz/responses', 'GET', '/api/quiz/responses')
+
+    def generate(self):
+        self.call('POST /api/recommendations/generate', 'POST', '/api/recommendations/generate')
+
+    def get_recommendations(self):
+        self.call('GET /api/recommendations', 'GET', '/api/recommendations')
+
+    def submit_feedback(self):
+        status, _, content = self.call('POST /api/feedback', 'POST', '/api/feedback',
+                                       {'message': f'Load test feedback {self.rng.randrange(10 ** 6)}'})
+        if status == 201:
+            self.shared['feedback_ids'].append(json.loads(content)['feedback']['id'])
+
+    def get_feedback(self):
+        self.call('GET /api/feedback', 'GET', '/api/feedback')
+
+    def me(self):
+        self.call('GET /api/auth/me', 'GET', '/api/auth/me')
+
+    def register(self):
+        client = self.make_client()
+        email = f'load-{os.getpid()}-{threading.get_ident()}-{self.rng.randrange(10 ** 9)}@register.example.com'
+        status, _, content = self.call('POST /api/auth/register', 'POST', '/api/auth/register',
+                                       {'name': 'Registered Load User', 'email': email, 'password': PASSWORD}, client)
+        if status == 201:
+            self.shared['disposable_users'].append(json.loads(content)['user']['id'])
+            self.call('POST /api/auth/logout', 'POST', '/api/auth/logout', client=client)
+
+    # Admin requests
+
+    def list_users(self):
+        self.page('GET /api/users', '/api/users')
+
+    def get_user(self):
+        user_id = self.rng.randint(1, self.population)
+        self.call('GET /api/users/<id>', 'GET', f'/api/users/{user_id}')
+
+    def update_user(self):
+        user_id = self.rng.randint(1, self.population)
+        self.call('PUT /api/users/<id>', 'PUT', f'/api/users/{user_id}', {'name': f'Load User {user_id}'})
+
+    def create_user(self):
+        email = f'created-{os.getpid()}-{threading.get_ident()}-{self.rng.randrange(10 ** 9)}@load.example.com'
+        status, _, content = self.call('POST /api/users', 'POST', '/api/users',
+                                       {'name': 'Created Load User', 'email': email, 'password': PASSWORD})
+        if status == 201:
+            self.shared['disposable_users'].append(json.loads(content)['id'])
+
+    def delete_user(self):
+        try:
+            user_id = self.shared['disposable_users'].popleft()
+        except IndexError:
+            return self.create_user()
+        self.call('DELETE /api/users/<id>', 'DELETE', f'/api/users/{user_id}')
+
+    def list_responses(self):
+        self.page('GET /api/quiz/responses/all', '/api/quiz/responses/all')
+
+    def list_recommendations(self):
+        self.page('GET /api/recommendations/all', '/api/recommendations/all')
+
+    def list_feedback(self):
+        self.page('GET /api/feedback/all', '/api/feedback/all')
+
+    def delete_feedback(self):
+        try:
+            feedback_id = self.shared['feedback_ids'].popleft()
+        except IndexError:
+            return self.list_feedback()
+        self.call('DELETE /api/feedback/<id>', 'DELETE', f'/api/feedback/{feedback_id}')
+
+    def export_responses(self):
+        self.call('GET /api/quiz/responses/export', 'GET', f'/api/quiz/responses/export?{self.random_day()}')
+
+    def export_recommendations(self):
+        self.call('GET /api/recommendations/export', 'GET', f'/api/recommendations/export?{self.random_day()}')
+
+    def catalog_info(self):
+        self.call('GET /api/recommendations/catalog', 'GET', '/api/recommendations/catalog')
+
+    def reload_catalog(self):
+        self.call('POST /api/recommendations/catalog/reload', 'POST', '/api/recommendations/catalog/reload')
+
+    def create_and_delete_question(self):
+        status, _, content = self.call('POST /api/quiz/questions', 'POST', '/api/quiz/questions', {
+            'question_text': 'Temporary load test question?',
+            'category': 'load',
+            'options': [{'value': 'yes', 'label': 'Yes'}, {'value': 'no', 'label': 'No'}],
+        })
+        if status == 201:
+            question_id = json.loads(content)['question']['id']
+            self.call('DELETE /api/quiz/questions/<id>', 'DELETE', f'/api/quiz/questions/{question_id}')
+
+
+# (request, relative weight); a student session mostly reads and now and then rescored
+STUDENT_MIX = [
+    (VirtualUser.get_questions, 20),
+    (VirtualUser.get_recommendations, 20),
+    (VirtualUser.me, 10),
+    (VirtualUser.submit_response, 8),
+    (VirtualUser.generate, 8),
+    (VirtualUser.get_responses, 5),
+    (VirtualUser.get_feedback, 3),
+    (VirtualUser.submit_feedback, 2),
+    (VirtualUser.login, 2),
+    (VirtualUser.register, 1),
+]
+ADMIN_MIX = [
+    (VirtualUser.list_users, 10),
+    (VirtualUser.list_responses, 8),
+    (VirtualUser.list_recommendations, 8),
+    (VirtualUser.list_feedback, 8),
+    (VirtualUser.get_user, 10),
+    (VirtualUser.update_user, 3),
+    (VirtualUser.create_user, 1),
+    (VirtualUser.delete_user, 2),
+    (VirtualUser.delete_feedback, 2),
+    (VirtualUser.export_responses, 1),
+    (VirtualUser.export_recommendations, 1),
+    (VirtualUser.catalog_info, 2),
+    (VirtualUser.reload_catalog, 0.2),
+    (VirtualUser.create_and_delete_question, 0.2),
+]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, duration):
+    values = sorted(latencies)
+    return {
+        'requests': len(values),
+        'errors': sum(errors.values()),
+        'error_statuses': {str(status): count for status, count in sorted(errors.items())},
+        'throughput_rps': round(len(values) / duration, 2),
+        'p50_ms': round(percentile(values, 0.50) * 1000, 3) if values else None,
+        'p95_ms': round(percentile(values, 0.95) * 1000, 3) if values else None,
+        'p99_ms': round(percentile(values, 0.99) * 1000, 3) if values else None,
+        'max_ms': round(values[-1] * 1000, 3) if values else None,
+    }
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def setup_in_process(args):
+    if args.database:
+        database = os.path.abspath(args.database)
+        seed = not os.path.exists(database)
+    else:
+        database = os.path.join(tempfile.mkdtemp(prefix='load-test-'), 'load.db')
+        seed = True
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+    os.environ['RATELIMIT_ENABLED'] = 'false'
+
+    from main import create_app, init_database, warm_caches
+    from seed_data import seed_population
+    app = create_app()
+    init_database(app)
+    warm_caches(app)
+    if seed:
+        started = time.perf_counter()
+        with app.app_context():
+            counts = seed_population(args.users, args.seed)
+        print(f'seeded {counts} in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+    return lambda: InProcessClient(app)
+
+
+def print_comparison(report, previous):
+    print(f'\nvs {previous.get("commit")}:')
+    for name, entry in report['endpoints'].items():
+        old = previous.get('endpoints', {}).get(name)
+        if not old or not old['p95_ms'] or not entry['p95_ms']:
+            continue
+        print(f'  {name:42s} rps {entry["throughput_rps"] - old["throughput_rps"]:+9.1f}  '
+              f'p95 {entry["p95_ms"] - old["p95_ms"]:+9.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10000, help='Synthetic population size (10k-1M)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent sessions (threads)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--database', help='SQLite file to reuse, seeded on first use')
+    parser.add_argument('--url', help='Load a running server instead of the in-process app')
+    parser.add_argument('--output', default='load_results.json', help='Where to write the JSON report')
+    parser.add_argument('--compare', help='Earlier JSON report to diff against')
+    args = parser.parse_args()
+
+    if args.url:
+        make_client = lambda: HttpClient(args.url)
+    else:
+        make_client = setup_in_process(args)
+
+    status, _, content = make_client().request('GET', '/api/quiz/questions')
+    if status != 200:
+        sys.exit(f'GET /api/quiz/questions returned {status}')
+    shared = {
+        'questions': [(str(q['id']), [option['value'] for option in q['options']]) for q in json.loads(content)],
+        'feedback_ids': collections.deque(),
+        'disposable_users': collections.deque(),
+    }
+
+    admins = admin_count(args.users)
+    master = random.Random(args.seed)
+    sessions = []
+    for index in range(args.clients):
+        rng = random.Random(master.randrange(2 ** 32))
+        if index % ADMIN_CLIENT_EVERY == 1:
+            sessions.append(VirtualUser(make_client, rng.randint(1, admins), 'admin', rng, args.users, shared))
+        else:
+            sessions.append(VirtualUser(make_client, rng.randint(admins + 1, args.users), 'student', rng, args.users, shared))
+
+    start_barrier = threading.Barrier(args.clients + 1)
+    stop_at = [0.0]
+
+    def run(session):
+        # All sessions log in at once, which can overflow the hashing queue
+        while True:
+            status, headers, _ = session.login()
+            if status != 503:
+                break
+            time.sleep(float(headers.get('Retry-After', 1)))
+        if status != 200:
+            print(f'login as user {session.user_id} failed with {status}', file=sys.stderr)
+        if session.role == 'student':
+            # Make sure generate has answers to score from the first request on
+            session.submit_response()
+        mix = STUDENT_MIX if session.role == 'student' else ADMIN_MIX
+        requests, weights = zip(*mix)
+        start_barrier.wait()
+        session.recording = True
+        while time.perf_counter() < stop_at[0]:
+            session.rng.choices(requests, weights)[0](session)
+
+    threads = [threading.Thread(target=run, args=(session,)) for session in sessions]
+    for thread in threads:
+        thread.start()
+    stop_at[0] = time.perf_counter() + args.duration
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = collections.defaultdict(list)
+    errors = collections.defaultdict(collections.Counter)
+    for session in sessions:
+        for name, values in session.latencies.items():
+            latencies[name].extend(values)
+        for name, statuses in session.errors.items():
+            errors[name].update(statuses)
+    all_errors = collections.Counter()
+    for statuses in errors.values():
+        all_errors.update(statuses)
+
+    report = {
+        'commit': git_commit(),
+        'started_at': datetime.utcnow().isoformat(),
+        'target': args.url or 'in-process',
+        'config': {
+            'users': args.users,
+            'seed': args.seed,
+            'clients': args.clients,
+            'admin_clients': sum(session.role == 'admin' for session in sessions),
+            'duration_s': round(elapsed, 2),
+        },
+        'total': summarize([value for values in latencies.values() for value in values], all_errors, elapsed),
+        'endpoints': {name: summarize(latencies[name], errors[name], elapsed) for name in sorted(latencies)},
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f'{"endpoint":42s} {"req/s":>9s} {"p50 ms":>9s} {"p95 ms":>9s} {"p99 ms":>9s} {"errors":>7s}')
+    for name, entry in list(report['endpoints'].items()) + [('TOTAL', report['total'])]:
+        print(f'{name:42s} {entry["throughput_rps"]:9.1f} {entry["p50_ms"]:9.2f} '
+              f'{entry["p95_ms"]:9.2f} {entry["p99_ms"]:9.2f} {entry["errors"]:7d}')
+    print(f'report written to {args.output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
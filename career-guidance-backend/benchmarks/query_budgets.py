@@ -0,0 +1,132 @@
+"""Scenarios and runner behind check_query_budgets.py; needs a scratch database."""
+from middleware.query_budget import QueryCounter, get_query_budget
+from models.user import User, db
+
+PASSWORD = 'budget-check-password'
+QUIZ_ANSWERS = {'1': 'analytical', '2': 'independent', '3': 'stem', '4': 'technical', '5': 'laboratory', '6': 'innovation'}
+
+
+def budget_scenarios():
+    """Return (endpoint, method, path, role, json, expected_status) in run order.
+
+    Paths are formatted with the ids created by seed_budget_data. Routes
+    with several code paths (e.g. generate, then generate again with
+    unchanged answers) appear once per path; each must fit the budget.
+    """
+    return [
+        ('auth.register', 'POST', '/api/auth/register', None,
+         {'name': 'New Student', 'email': 'new-student@example.com', 'password': PASSWORD}, 201),
+        ('auth.login', 'POST', '/api/auth/login', None,
+         {'email': 'student@example.com', 'password': PASSWORD}, 200),
+        ('auth.get_current_user', 'GET', '/api/auth/me', 'student', None, 200),
+        ('auth.logout', 'POST', '/api/auth/logout', 'student', None, 200),
+        ('user.get_users', 'GET', '/api/users', 'admin', None, 200),
+        ('user.create_user', 'POST', '/api/users', 'admin',
+         {'name': 'Created User', 'email': 'created@example.com', 'password': PASSWORD}, 201),
+        ('user.get_user', 'GET', '/api/users/{student_id}', 'admin', None, 200),
+        ('user.update_user', 'PUT', '/api/users/{student_id}', 'admin', {'name': 'Renamed Student'}, 200),
+        ('quiz.get_questions', 'GET', '/api/quiz/questions', 'student', None, 200),
+        ('quiz.create_question', 'POST', '/api/quiz/questions', 'admin',
+         {'question_text': 'Which budget question is this?', 'category': 'budget',
+          'options': [{'value': 'a', 'label': 'A'}, {'value': 'b', 'label': 'B'}]}, 201),
+        ('quiz.submit_quiz_response', 'POST', '/api/quiz/responses', 'student', {'answers': QUIZ_ANSWERS}, 201),
+        ('quiz.submit_quiz_response', 'POST', '/api/quiz/responses', 'student', {'answers': QUIZ_ANSWERS}, 201),
+        ('quiz.get_user_responses', 'GET', '/api/quiz/responses', 'student', None, 200),
+        ('quiz.get_all_responses', 'GET', '/api/quiz/responses/all', 'admin', None, 200),
+        ('quiz.export_responses', 'GET', '/api/quiz/responses/export', 'admin', None, 200),
+        ('recommendations.generate_recommendations', 'POST', '/api/recommendations/generate', 'student', None, 201),
+        ('recommendations.generate_recommendations', 'POST', '/api/recommendations/generate', 'student', None, 200),
+        ('recommendations.get_generation_job', 'GET', '/api/recommendations/jobs/unknown', 'student', None, 404),
+        ('recommendations.get_user_recommendations', 'GET', '/api/recommendations', 'student', None, 200),
+        ('recommendations.get_user_recommendations', 'GET', '/api/recommendations', 'student', None, 200),
+        ('recommendations.get_all_recommendations', 'GET', '/api/recommendations/all', 'admin', None, 200),
+        ('recommendations.export_recommendations', 'GET', '/api/recommendations/export', 'admin', None, 200),
+        ('analytics.get_analytics', 'GET', '/api/analytics', 'admin', None, 200),
+        ('analytics.get_analytics', 'GET', '/api/analytics?since=2020-01-01&until=2099-12-31', 'admin', None, 200),
+        ('recommendations.get_catalog_info', 'GET', '/api/recommendations/catalog', 'admin', None, 200),
+        ('recommendations.reload_catalog', 'POST', '/api/recommendations/catalog/reload', 'admin', None, 200),
+        ('feedback.submit_feedback', 'POST', '/api/feedback', 'student',
+         {'message': 'The recommendations were useful.'}, 201),
+        ('feedback.get_user_feedback', 'GET', '/api/feedback', 'student', None, 200),
+        ('feedback.get_all_feedback', 'GET', '/api/feedback/all', 'admin', None, 200),
+        ('feedback.delete_feedback', 'DELETE', '/api/feedback/{feedback_id}', 'admin', None, 200),
+        ('quiz.delete_question', 'DELETE', '/api/quiz/questions/{question_id}', 'admin', None, 200),
+        # Deleted question ids must not be reused: their answer options and packed answers remain
+        ('quiz.create_question', 'POST', '/api/quiz/questions', 'admin',
+         {'question_text': 'Which replacement question is this?', 'category': 'budget',
+          'options': [{'value': 'a', 'label': 'A'}, {'value': 'b', 'label': 'B'}]}, 201),
+        ('user.delete_user', 'DELETE', '/api/users/{student_id}', 'admin', None, 200),
+    ]
+
+
+def seed_budget_data():
+    """Create the admin and student the scenarios act as; return their ids"""
+    admin = User(name='Budget Admin', email='admin@example.com', role='admin')
+    student = User(name='Budget Student', email='student@example.com')
+    admin.set_password(PASSWORD)
+    student.set_password(PASSWORD)
+    db.session.add_all([admin, student])
+    db.session.commit()
+    return {'admin': admin.id, 'student': student.id}
+
+
+def route_endpoints(app):
+    """Endpoints of every view defined in routes/"""
+    return sorted(
+        endpoint for endpoint, view in app.view_functions.items()
+        if view.__module__.startswith('routes.')
+    )
+
+
+def check_query_budgets(app):
+    """Drive every route through the test client, returning [(endpoint, queries, budget, problem)].
+
+    Must run against a scratch database: scenarios create and delete rows.
+    """
+    with app.app_context():
+        if User.query.count():
+            raise RuntimeError('Query budget checks need an empty scratch database')
+        users = seed_budget_data()
+        ids = {'student_id': users['student']}
+
+    client = app.test_client()
+    results = []
+    deleted_questions = set()
+    for endpoint, method, path, role, body, expected_status in budget_scenarios():
+        with client.session_transaction() as sess:
+            sess.clear()
+            if role:
+                sess['user_id'] = users[role]
+                sess['user_role'] = role
+
+        budget = get_query_budget(app.view_functions[endpoint])
+        with app.app_context():
+            with QueryCounter(engine=db.engine, label=f'{method} {path}') as counter:
+                response = client.open(path.format(**ids), method=method, json=body)
+                response.get_data()
+
+        problem = None
+        if response.status_code != expected_status:
+            problem = f'expected {expected_status}, got {response.status_code}: {response.get_data(as_text=True)[:200]}'
+        elif budget is None:
+            problem = 'no @query_budget declared'
+        elif counter.count > budget:
+            counter.budget = budget
+            problem = counter.report()
+        # Later scenarios act on rows the earlier ones created
+        if problem is None and endpoint == 'quiz.create_question':
+            question_id = response.get_json()['question']['id']
+            if question_id in deleted_questions:
+                problem = f'reused the id of deleted question {question_id}'
+            ids['question_id'] = question_id
+        elif endpoint == 'quiz.delete_question':
+            deleted_questions.add(ids['question_id'])
+        elif endpoint == 'feedback.submit_feedback':
+            ids['feedback_id'] = response.get_json()['feedback']['id']
+        results.append((endpoint, counter.count, budget, problem))
+
+    covered = {endpoint for endpoint, *_ in budget_scenarios()}
+    for endpoint in route_endpoints(app):
+        if endpoint not in covered:
+            results.append((endpoint, None, get_query_budget(app.view_functions[endpoint]), 'no budget scenario'))
+    return results
@@ -0,0 +1,164 @@
+"""Seed a database with a deterministic synthetic population for load tests.
+
+Usage: python benchmarks/seed_data.py --database /tmp/load.db [--users 10000] [--seed 0]
+
+The same --users/--seed always produce the same rows, so results from
+different commits are comparable. Users get ids 1..N; the lowest
+N / ADMIN_EVERY ids are admins, and every account uses PASSWORD.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = 'load-test-password'
+BASE_TIME = datetime(2025, 1, 1)
+ADMIN_EVERY = 1000
+CHUNK_SIZE = 5000
+RESPONSE_RATIO = 0.8
+RECOMMENDATION_RATIO = 0.75
+FEEDBACK_RATIO = 0.3
+
+
+def admin_count(users):
+    return max(1, users // ADMIN_EVERY)
+
+
+def user_email(user_id):
+    return f'user{user_id}@load.example.com'
+
+
+def random_answers(rng, questions):
+    """One answers dict in the API shape: {question id: option value}"""
+    return {str(question_id): rng.choice(values) for question_id, values in questions}
+
+
+def load_questions():
+    from models.user import Question
+    return [
+        (question.id, [option['value'] for option in json.loads(question.options)])
+        for question in Question.query.order_by(Question.id)
+    ]
+
+
+def seed_population(users, seed=0, chunk_size=CHUNK_SIZE, progress=None):
+    """Insert users, quiz responses, recommendations and feedback (needs an app context).
+
+    Rows are generated chunk by chunk from one seeded random stream and
+    written with executemany, so memory stays flat up to millions of users.
+    Returns a dict of row counts.
+    """
+    from sqlalchemy import insert
+    from models.user import CareerRecommendation, Feedback, QuizResponse, User, db
+    from services.career_catalog import catalog_registry
+    from services.analytics import rebuild_counters
+    from services.answer_codec import answer_codec
+    from services.careers import career_cache
+    from services.password_hashing import password_hasher
+
+    if User.query.count():
+        raise RuntimeError('seed_population needs an empty database')
+    if db.session.get_bind().dialect.name == 'sqlite':
+        db.session.execute(db.text('PRAGMA synchronous = OFF'))
+
+    questions = load_questions()
+    snapshot = catalog_registry.get()
+    career_ids = career_cache.ids_for(snapshot)
+    password_hash = password_hasher.hash(PASSWORD)
+    admins = admin_count(users)
+    rng = random.Random(seed)
+    counts = {'users': 0, 'quiz_responses': 0, 'career_recommendations': 0, 'feedback': 0}
+    started = time.perf_counter()
+
+    for first in range(1, users + 1, chunk_size):
+        user_rows, response_rows, scored, feedback_rows = [], [], [], []
+        for user_id in range(first, min(first + chunk_size, users + 1)):
+            created_at = BASE_TIME + timedelta(seconds=user_id * 30)
+            user_rows.append({
+                'id': user_id,
+                'name': f'Load User {user_id}',
+                'email': user_email(user_id),
+                'password_hash': password_hash,
+                'role': 'admin' if user_id <= admins else 'student',
+                'created_at': created_at,
+            })
+            if rng.random() < RESPONSE_RATIO:
+                answers = random_answers(rng, questions)
+                answered_at = created_at + timedelta(minutes=rng.randint(1, 60 * 24 * 30))
+                response_rows.append({
+                    'id': user_id,
+                    'user_id': user_id,
+                    'timestamp': answered_at,
+                    'answer_codes': answer_codec.encode(answers),
+                })
+                if rng.random() < RECOMMENDATION_RATIO:
+                    scored.append((user_id, answers, answered_at + timedelta(minutes=1)))
+            for _ in range(rng.randint(1, 3) if rng.random() < FEEDBACK_RATIO else 0):
+                feedback_rows.append({
+                    'user_id': user_id,
+                    'message': f'Synthetic feedback message {rng.randrange(10 ** 6)}',
+                    'date': created_at + timedelta(minutes=rng.randint(1, 60 * 24 * 60)),
+                })
+
+        recommendation_rows = []
+        if scored:
+            batch = snapshot.engine.recommend_batch([answers for _, answers, _ in scored])
+            for (user_id, answers, created_at), recommendations in zip(scored, batch):
+                fingerprint = snapshot.fingerprint(answers)
+                recommendation_rows.extend({
+                    'user_id': user_id,
+                    'career_id': career_ids[rec['career']],
+                    'score': rec['score'],
+                    'answers_fingerprint': fingerprint,
+                    'created_at': created_at,
+                } for rec in recommendations)
+
+        for model, rows, key in (
+            (User, user_rows, 'users'),
+            (QuizResponse, response_rows, 'quiz_responses'),
+            (CareerRecommendation, recommendation_rows, 'career_recommendations'),
+            (Feedback, feedback_rows, 'feedback'),
+        ):
+            if rows:
+                db.session.execute(insert(model), rows)
+                counts[key] += len(rows)
+        db.session.commit()
+        if progress:
+            progress(counts['users'], users, time.perf_counter() - started)
+    # Rows were inserted directly, so count them for the admin analytics in one pass
+    counts['analytics_counters'] = rebuild_counters()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', required=True, help='SQLite file to create')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        parser.error(f'{args.database} already exists')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.database)}'
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    from main import create_app, init_database
+    app = create_app()
+    init_database(app)
+
+    def progress(done, total, elapsed):
+        print(f'\r{done}/{total} users  {done / elapsed:,.0f} users/s', end='', file=sys.stderr, flush=True)
+
+    with app.app_context():
+        counts = seed_population(args.users, args.seed, progress=progress)
+    print(file=sys.stderr)
+    print(json.dumps(counts))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+import json
+import click
+from flask.cli import AppGroup
+from services.shared_cache import shared_cache
+
+cache_cli = AppGroup('cache', help='Node-local shared cache commands.')
+
+
+@cache_cli.command('stats')
+def stats():
+    """Show the shared cache location, generations and stored payloads."""
+    click.echo(json.dumps(shared_cache.stats(), indent=2))
+
+
+@cache_cli.command('clear')
+def clear():
+    """Invalidate the questions, catalog and recommendation caches of every worker on this node."""
+    shared_cache.clear()
+    click.echo(f'Cleared shared cache at {shared_cache.path or "(process memory)"}')
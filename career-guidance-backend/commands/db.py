@@ -0,0 +1,42 @@
+import click
+from flask.cli import AppGroup
+from models.migrations import MIGRATIONS, upgrade_database
+from models.seed import seed_default_questions
+from services.shared_cache import shared_cache
+
+db_cli = AppGroup('db', help='Database schema and query plan commands.')
+
+
+@db_cli.command('upgrade')
+def upgrade():
+    """Create missing tables and apply pending migrations."""
+    upgrade_database()
+    # Running workers must not keep payloads built from the old schema
+    shared_cache.clear()
+    click.echo(f'Database is at schema version {MIGRATIONS[-1][0]}')
+
+
+@db_cli.command('init')
+def init():
+    """Create the schema, apply migrations and add the default quiz questions."""
+    upgrade_database()
+    added = seed_default_questions()
+    shared_cache.clear()
+    click.echo(f'Database is at schema version {MIGRATIONS[-1][0]}; added {added} default questions')
+
+
+@db_cli.command('check-plans')
+def check_plans():
+    """Fail if any route query degrades to a full table scan or temp sort."""
+    from services.query_plans import check_query_plans
+
+    upgrade_database()
+    failures = 0
+    for route, plan, problems in check_query_plans():
+        status = 'FAIL' if problems else 'ok'
+        click.echo(f'[{status}] {route}')
+        for line in plan:
+            click.echo(f'        {line}')
+        failures += bool(problems)
+    if failures:
+        raise click.ClickException(f'{failures} route queries use a full table scan or temp sort')
@@ -0,0 +1,45 @@
+import sys
+import click
+from flask.cli import with_appcontext
+from models.user import CareerRecommendation, QuizResponse
+from routes.quiz import RESPONSE_ANSWER_FIELDS, RESPONSE_FIELDS
+from routes.recommendations import RECOMMENDATION_CAREER_FIELDS, RECOMMENDATION_FIELDS
+from services.answer_codec import answer_codec
+from services.careers import career_cache
+from services.export import EXPORT_FORMATS, ExportError, export_chunks, parse_date
+
+EXPORTS = {
+    'responses': (QuizResponse, RESPONSE_FIELDS, 'timestamp', RESPONSE_ANSWER_FIELDS, answer_codec.expand),
+    'recommendations': (CareerRecommendation, RECOMMENDATION_FIELDS, 'created_at',
+                        RECOMMENDATION_CAREER_FIELDS, career_cache.expand),
+}
+
+
+@click.command('export')
+@click.argument('table', type=click.Choice(list(EXPORTS)))
+@click.option('--format', 'export_format', type=click.Choice(list(EXPORT_FORMATS)), default='ndjson')
+@click.option('--since', help='Only rows on or after this ISO date')
+@click.option('--until', help='Only rows before this ISO date')
+@click.option('--gzip', 'compress', is_flag=True, help='Gzip the output on the fly')
+@click.option('--chunk-size', type=int, default=1000, show_default=True, help='Rows fetched per round trip')
+@click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True), help='File to write (default: stdout)')
+@with_appcontext
+def export_cli(table, export_format, since, until, compress, chunk_size, output):
+    """Stream quiz responses or recommendations as NDJSON or CSV."""
+    model, fields, date_field, computed, transform = EXPORTS[table]
+    try:
+        chunks = export_chunks(
+            model, fields, export_format, date_field,
+            parse_date(since, 'since'), parse_date(until, 'until'),
+            compress, chunk_size, computed, transform
+        )
+    except ExportError as e:
+        raise click.BadParameter(str(e))
+
+    stream = open(output, 'wb') if output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            stream.write(chunk)
+    finally:
+        if output:
+            stream.close()
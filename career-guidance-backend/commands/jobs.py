@@ -0,0 +1,32 @@
+import time
+import click
+from flask.cli import AppGroup
+from services.generation_jobs import generation_jobs
+
+jobs_cli = AppGroup('jobs', help='Recommendation generation job commands.')
+
+
+@jobs_cli.command('work')
+@click.option('--interval', type=float, default=1.0, show_default=True, help='Seconds to wait when the queue is empty')
+@click.option('--once', is_flag=True, help='Exit once the queue is empty instead of polling')
+def work(interval, once):
+    """Consume queued recommendation jobs (for RECOMMENDATION_JOB_WORKERS=0)."""
+    processed = 0
+    while True:
+        if generation_jobs.run_next():
+            processed += 1
+            continue
+        failed, deleted = generation_jobs.prune()
+        if failed:
+            click.echo(f'Failed {failed} timed out jobs')
+        if once:
+            break
+        time.sleep(interval)
+    click.echo(f'Processed {processed} jobs; removed {deleted} expired jobs')
+
+
+@jobs_cli.command('prune')
+def prune():
+    """Fail timed out jobs and delete finished jobs past retention."""
+    failed, deleted = generation_jobs.prune()
+    click.echo(f'Failed {failed} timed out jobs; removed {deleted} expired jobs')
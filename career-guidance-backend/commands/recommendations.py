@@ -0,0 +1,96 @@
+import collections
+import multiprocessing
+import os
+import time
+import click
+from concurrent.futures import ProcessPoolExecutor
+from flask.cli import AppGroup
+from services.career_catalog import catalog_registry
+from services.careers import career_cache
+from services.generation import replace_recommendations, stale_response_chunks
+
+recommendations_cli = AppGroup('recommendations', help='Stored career recommendation commands.')
+
+_worker_engine = None
+
+
+def _init_worker(engine):
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _score(answer_sets):
+    return _worker_engine.recommend_batch(answer_sets)
+
+
+@recommendations_cli.command('regenerate')
+@click.option('--chunk-size', type=int, default=1000, show_default=True,
+              help='Quiz responses read, scored and written per transaction')
+@click.option('--workers', type=int, default=os.cpu_count() or 1, show_default=True,
+              help='Scoring processes (0 = score in this process)')
+@click.option('--force', is_flag=True, help='Rescore users whose recommendations are already current')
+def regenerate(chunk_size, workers, force):
+    """Rescore every user's latest quiz response against the current catalog.
+
+    Users whose stored recommendations already match their answers and the
+    catalog version are skipped, so an interrupted run resumes where it
+    stopped when started again. Each chunk is committed on its own.
+    """
+    from models.user import QuizResponse
+
+    snapshot = catalog_registry.reload()
+    engine = snapshot.engine
+    career_ids = career_cache.ids_for(snapshot)
+    total = QuizResponse.query.count()
+    click.echo(f'Regenerating recommendations for {total} quiz responses against catalog '
+               f'{snapshot.version} ({"all" if force else "stale only"}, {workers or "no"} workers)', err=True)
+
+    executor = None
+    if workers:
+        context = None
+        if 'fork' in multiprocessing.get_all_start_methods():
+            # Forked workers inherit the compiled engine instead of unpickling it
+            context = multiprocessing.get_context('fork')
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                       initializer=_init_worker, initargs=(engine,))
+
+    scanned = regenerated = rows_written = 0
+    started = time.perf_counter()
+    # Chunks being scored while the next ones are read and earlier ones written
+    pending = collections.deque()
+
+    def write_oldest():
+        nonlocal regenerated, rows_written
+        chunk, recommendations = pending.popleft()
+        recommendations = recommendations.result() if executor else recommendations
+        rows_written += replace_recommendations([
+            (user_id, fingerprint, recs) for (user_id, _, fingerprint), recs in zip(chunk, recommendations)
+        ], career_ids)
+        regenerated += len(chunk)
+
+    def report():
+        queued = sum(len(chunk) for chunk, _ in pending)
+        click.echo(f'  {scanned}/{total} scanned, {regenerated} regenerated, {queued} scoring, '
+                   f'{scanned - regenerated - queued} current, '
+                   f'{scanned / (time.perf_counter() - started):.0f} users/s', err=True)
+
+    try:
+        for count, chunk in stale_response_chunks(snapshot, chunk_size, force):
+            scanned += count
+            if chunk:
+                answer_sets = [answers for _, answers, _ in chunk]
+                pending.append((chunk, executor.submit(_score, answer_sets) if executor
+                                else engine.recommend_batch(answer_sets)))
+                if len(pending) > max(1, workers) * 2:
+                    write_oldest()
+            report()
+        while pending:
+            write_oldest()
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    click.echo(f'Regenerated {regenerated} of {scanned} users ({scanned - regenerated} already current, '
+               f'{rows_written} rows) in {elapsed:.1f}s: {scanned / elapsed:.0f} users/s scanned, '
+               f'{regenerated / elapsed:.0f} users/s regenerated')
@@ -0,0 +1,52 @@
+"""Gunicorn settings for serving the API on all cores of one node.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is preloaded in the master so schema checks and cache warm-up run
+once; workers are forked afterwards and only rebuild their database
+connection pool. Tune with the GUNICORN_* variables below.
+
+Reloading: SIGHUP restarts the workers gracefully with the already
+loaded code (picks up config changes; the career catalog hot-reloads on
+its own). To deploy new code with preload_app, send SIGUSR2 to start a
+new master alongside the old one, then SIGTERM the old master once the
+new workers are serving.
+"""
+import multiprocessing
+import os
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', os.getenv('WEB_CONCURRENCY', str(cpu_count * 2 + 1))))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = True
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+# Recycle workers after this many requests (0 = never), jittered so they don't restart together
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+# Each worker owns a password hashing pool; split the cores between them
+# rather than giving every worker cpu_count hashing processes
+os.environ.setdefault('PASSWORD_HASH_WORKERS', str(max(1, cpu_count // workers)))
+
+
+def when_ready(server):
+    # Connections opened while preloading must not be shared with children
+    from models.user import db
+    from wsgi import app
+    with app.app_context():
+        db.engine.dispose()
+
+
+def post_fork(server, worker):
+    # Give the worker a fresh pool without touching the master's sockets
+    from models.user import db
+    from wsgi import app
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -12,139 +12,220 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from flask_wtf.csrf import CSRFProtect
 from models.user import db
-from routes.user import user_bp
-from routes.auth import auth_bp
-from routes.quiz import quiz_bp
-from routes.recommendations import recommendations_bp
-from routes.feedback import feedback_bp
-
-app = Flask(__name__)
-
-# Configuration
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'fallback-secret-key-change-this')
-app.config['WTF_CSRF_TIME_LIMIT'] = None
-app.config['SESSION_COOKIE_SECURE'] = os.getenv('FLASK_ENV') == 'production'
-app.config['SESSION_COOKIE_HTTPONLY'] = True
-app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
-
-# Initialize CSRF protection (disabled for development)
-# csrf = CSRFProtect(app)
+from models.sqlite_profile import sqlite_profile
+from middleware.admission import admission_control, parse_class_limits
+from middleware.metrics import request_metrics
+from services.career_catalog import catalog_registry
+from services.answer_codec import answer_codec
+from services.careers import career_cache
+from services.generation_jobs import generation_jobs
+from services.password_hashing import DEFAULT_HASH_METHOD, password_hasher
+from services.question_cache import question_cache
+from services.recommendation_cache import recommendation_cache
+from services.shared_cache import default_path, shared_cache
+# Registers the shared:// rate limit storage used by default
+import services.rate_limit_storage  # noqa: F401
 
 # Initialize rate limiter
 limiter = Limiter(
     key_func=get_remote_address,
     default_limits=["200 per day", "50 per hour"]
 )
-limiter.init_app(app)
-
-# Enable CORS for all routes
-cors_origins = os.getenv('CORS_ORIGINS', 'http://localhost:3000,http://localhost:5173').split(',')
-CORS(app, supports_credentials=True, origins=cors_origins)
-
-# Register blueprints
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(quiz_bp, url_prefix='/api/quiz')
-app.register_blueprint(recommendations_bp, url_prefix='/api')
-app.register_blueprint(feedback_bp, url_prefix='/api')
-
-# Database configuration
-database_url = os.getenv('DATABASE_URL', 'sqlite:///app.db')
-app.config['SQLALCHEMY_DATABASE_URI'] = database_url
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-
-with app.app_context():
-    db.create_all()
-    
-    # Initialize default quiz questions if none exist
-    from models.user import Question
-    import json
-    
-    if Question.query.count() == 0:
-        default_questions = [
-            {
-                'question_text': 'Which type of activities do you find most engaging?',
-                'category': 'interests',
-                'options': [
-                    {'value': 'analytical', 'label': 'Analyzing data and solving complex problems'},
-                    {'value': 'creative', 'label': 'Creating and designing new things'},
-                    {'value': 'social', 'label': 'Working with and helping people'},
-                    {'value': 'practical', 'label': 'Building and fixing things with your hands'}
-                ]
-            },
-            {
-                'question_text': 'How do you prefer to work?',
-                'category': 'personality',
-                'options': [
-                    {'value': 'team', 'label': 'In a collaborative team environment'},
-                    {'value': 'independent', 'label': 'Independently with minimal supervision'},
-                    {'value': 'leadership', 'label': 'Leading and directing others'},
-                    {'value': 'structured', 'label': 'In a structured, organized setting'}
-                ]
-            },
-            {
-                'question_text': 'Which subject area interests you most?',
-                'category': 'academic',
-                'options': [
-                    {'value': 'stem', 'label': 'Science, Technology, Engineering, Math'},
-                    {'value': 'humanities', 'label': 'Literature, History, Philosophy'},
-                    {'value': 'arts', 'label': 'Visual Arts, Music, Theater'},
-                    {'value': 'business', 'label': 'Business, Economics, Finance'}
-                ]
-            },
-            {
-                'question_text': 'What is your greatest strength?',
-                'category': 'skills',
-                'options': [
-                    {'value': 'communication', 'label': 'Communication and interpersonal skills'},
-                    {'value': 'technical', 'label': 'Technical and analytical abilities'},
-                    {'value': 'creativity', 'label': 'Creative thinking and innovation'},
-                    {'value': 'organization', 'label': 'Organization and attention to detail'}
-                ]
-            },
-            {
-                'question_text': 'What type of work environment appeals to you?',
-                'category': 'environment',
-                'options': [
-                    {'value': 'office', 'label': 'Traditional office setting'},
-                    {'value': 'remote', 'label': 'Remote or flexible workspace'},
-                    {'value': 'outdoors', 'label': 'Outdoor or field work'},
-                    {'value': 'laboratory', 'label': 'Laboratory or research facility'}
-                ]
-            },
-            {
-                'question_text': 'What motivates you most in your career?',
-                'category': 'values',
-                'options': [
-                    {'value': 'impact', 'label': 'Making a positive impact on society'},
-                    {'value': 'growth', 'label': 'Personal and professional growth'},
-                    {'value': 'stability', 'label': 'Job security and stability'},
-                    {'value': 'innovation', 'label': 'Innovation and cutting-edge work'}
-                ]
-            }
-        ]
-        
-        for q_data in default_questions:
-            question = Question(
-                question_text=q_data['question_text'],
-                category=q_data['category'],
-                options=json.dumps(q_data['options'])
-            )
-            db.session.add(question)
-        
+
+
+def load_config(app):
+    """Read configuration from the environment"""
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'fallback-secret-key-change-this')
+    app.config['SESSION_COOKIE_SECURE'] = os.getenv('FLASK_ENV') == 'production'
+    app.config['SESSION_COOKIE_HTTPONLY'] = True
+    app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+
+    # Database configuration
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///app.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # SQLite connection pragmas and pool sizing (ignored for other databases)
+    app.config['SQLITE_JOURNAL_MODE'] = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_SYNCHRONOUS'] = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    app.config['SQLITE_CACHE_SIZE_KB'] = int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536'))
+    app.config['SQLITE_MMAP_SIZE'] = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    app.config['SQLITE_POOL_SIZE'] = int(os.getenv('SQLITE_POOL_SIZE', '5'))
+    app.config['SQLITE_MAX_OVERFLOW'] = int(os.getenv('SQLITE_MAX_OVERFLOW', '10'))
+    app.config['SQLITE_POOL_TIMEOUT'] = float(os.getenv('SQLITE_POOL_TIMEOUT', '30'))
+
+    # Serve recommendations from a precomputed table of every answer combination
+    app.config['RECOMMENDATION_LOOKUP_TABLE'] = os.getenv('RECOMMENDATION_LOOKUP_TABLE', 'false').lower() == 'true'
+    app.config['RECOMMENDATION_LOOKUP_MAX_COMBINATIONS'] = int(os.getenv('RECOMMENDATION_LOOKUP_MAX_COMBINATIONS', '65536'))
+
+    # Generate recommendations as background jobs polled by id (0 workers = `flask jobs work` consumes them)
+    app.config['RECOMMENDATION_JOBS_ENABLED'] = os.getenv('RECOMMENDATION_JOBS_ENABLED', 'false').lower() == 'true'
+    app.config['RECOMMENDATION_JOB_WORKERS'] = int(os.getenv('RECOMMENDATION_JOB_WORKERS', '2'))
+    app.config['RECOMMENDATION_JOB_TIMEOUT'] = float(os.getenv('RECOMMENDATION_JOB_TIMEOUT', '300'))
+    app.config['RECOMMENDATION_JOB_RETENTION'] = float(os.getenv('RECOMMENDATION_JOB_RETENTION', '3600'))
+
+    # Node-local cache shared by all workers: generation counters and payloads under one directory
+    # (default: a per-database directory in the temp dir; disabled = per-process only)
+    app.config['SHARED_CACHE_ENABLED'] = os.getenv('SHARED_CACHE_ENABLED', 'true').lower() == 'true'
+    app.config['SHARED_CACHE_PATH'] = os.getenv('SHARED_CACHE_PATH')
+    app.config['SHARED_CACHE_SLOTS'] = int(os.getenv('SHARED_CACHE_SLOTS', '4096'))
+
+    # Rate limiting (RATELIMIT_ENABLED=false for load tests). Limits are counted once per node in
+    # the shared cache directory; RATELIMIT_STORAGE_URI=memory:// counts per worker instead
+    app.config['RATELIMIT_ENABLED'] = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    app.config['RATELIMIT_STRATEGY'] = os.getenv('RATELIMIT_STRATEGY', 'fixed-window')
+    if os.getenv('RATELIMIT_STORAGE_URI'):
+        app.config['RATELIMIT_STORAGE_URI'] = os.getenv('RATELIMIT_STORAGE_URI')
+    elif app.config['SHARED_CACHE_ENABLED']:
+        shared_path = app.config['SHARED_CACHE_PATH'] or default_path(app)
+        app.config['RATELIMIT_STORAGE_URI'] = f'shared://{os.path.join(os.path.abspath(shared_path), "rate_limits.db")}'
+    else:
+        app.config['RATELIMIT_STORAGE_URI'] = 'memory://'
+
+    # Per-process LRU of GET /api/recommendations bodies, invalidated across workers (size 0 = off)
+    app.config['RECOMMENDATION_CACHE_SIZE'] = int(os.getenv('RECOMMENDATION_CACHE_SIZE', '10000'))
+    app.config['RECOMMENDATION_CACHE_TTL'] = float(os.getenv('RECOMMENDATION_CACHE_TTL', '60'))
+
+    # Career catalog file, re-checked for changes every few seconds
+    app.config['CAREER_CATALOG_PATH'] = os.getenv('CAREER_CATALOG_PATH')
+    app.config['CAREER_CATALOG_CHECK_INTERVAL'] = float(os.getenv('CAREER_CATALOG_CHECK_INTERVAL', '5'))
+
+    # Password hashing runs in a process pool with a bounded queue (0 workers = inline)
+    app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', DEFAULT_HASH_METHOD)
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+    app.config['PASSWORD_HASH_QUEUE_SIZE'] = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', '0')) or None
+    app.config['PASSWORD_HASH_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_TIMEOUT', '30'))
+
+    # Per-process caps on concurrent requests per endpoint class; excess waits briefly, then gets 503
+    # (classes: auth, scoring, admin, reads, writes; unlisted or 0 = unlimited; off = no hooks installed)
+    app.config['ADMISSION_CONTROL_ENABLED'] = os.getenv('ADMISSION_CONTROL_ENABLED', 'false').lower() == 'true'
+    app.config['ADMISSION_LIMITS'] = parse_class_limits(os.getenv('ADMISSION_LIMITS', 'auth=2,scoring=2,admin=2'))
+    app.config['ADMISSION_QUEUE_SIZE'] = int(os.getenv('ADMISSION_QUEUE_SIZE', '4'))
+    app.config['ADMISSION_QUEUE_TIMEOUT'] = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '1'))
+    app.config['ADMISSION_RETRY_AFTER'] = int(os.getenv('ADMISSION_RETRY_AFTER', '1'))
+
+    # Per-request latency and SQL metrics served on /metrics (off = no hooks installed)
+    app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+    app.config['SLOW_REQUEST_MS'] = float(os.getenv('SLOW_REQUEST_MS', '0')) or None
+
+
+def register_blueprints(app):
+    """Import and register the API blueprints"""
+    from routes.user import user_bp
+    from routes.auth import auth_bp
+    from routes.quiz import quiz_bp
+    from routes.recommendations import recommendations_bp
+    from routes.feedback import feedback_bp
+    from routes.analytics import analytics_bp
+
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(quiz_bp, url_prefix='/api/quiz')
+    app.register_blueprint(recommendations_bp, url_prefix='/api')
+    app.register_blueprint(feedback_bp, url_prefix='/api')
+    app.register_blueprint(analytics_bp, url_prefix='/api')
+
+
+def register_commands(app):
+    """Register the flask CLI command groups"""
+    from commands.analytics import analytics_cli
+    from commands.cache import cache_cli
+    from commands.db import db_cli
+    from commands.export import export_cli
+    from commands.jobs import jobs_cli
+    from commands.recommendations import recommendations_cli
+
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(cache_cli)
+    app.cli.add_command(db_cli)
+    app.cli.add_command(export_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(recommendations_cli)
+
+
+def create_app():
+    """Build the app without touching the database.
+
+    Schema creation and the default questions are left to `flask db init`;
+    call warm_caches() before serving to load the catalog and questions.
+    """
+    app = Flask(__name__)
+    load_config(app)
+
+    limiter.init_app(app)
+
+    # Enable CORS for all routes
+    cors_origins = os.getenv('CORS_ORIGINS', 'http://localhost:3000,http://localhost:5173').split(',')
+    CORS(app, supports_credentials=True, origins=cors_origins)
+
+    register_blueprints(app)
+    register_commands(app)
+
+    sqlite_profile.init_app(app)
+    db.init_app(app)
+    shared_cache.init_app(app)
+    catalog_registry.init_app(app)
+    password_hasher.init_app(app)
+    generation_jobs.init_app(app)
+    recommendation_cache.init_app(app)
+    request_metrics.init_app(app)
+    request_metrics.register_collector(recommendation_cache.metrics_lines)
+    request_metrics.register_collector(shared_cache.metrics_lines)
+    # After metrics, so shed requests are still counted
+    admission_control.init_app(app)
+    request_metrics.register_collector(admission_control.metrics_lines)
+    if request_metrics.enabled:
+        limiter.exempt(app.view_functions['metrics'])
+
+    @app.route('/')
+    def health_check():
+        return jsonify({
+            'message': 'AI Career Guidance API is running',
+            'status': 'healthy',
+            'version': '1.0.0'
+        })
+
+    return app
+
+
+def init_database(app):
+    """Create or upgrade the schema, add the default quiz questions and the catalog's careers.
+
+    Everything in the shared cache is dropped afterwards, since the
+    database it was built from may have been replaced or migrated.
+    """
+    from models.migrations import upgrade_database
+    from models.seed import seed_default_questions
+
+    with app.app_context():
+        upgrade_database()
+        seed_default_questions()
+        career_cache.ids_for(catalog_registry.reload())
         db.session.commit()
+        shared_cache.clear()
+
 
-@app.route('/')
-def health_check():
-    return jsonify({
-        'message': 'AI Career Guidance API is running',
-        'status': 'healthy',
-        'version': '1.0.0'
-    })
+def warm_caches(app):
+    """Load the career catalog and career rows, the questions, answer options and answer space up front.
+
+    Under a preloading server this runs once in the master and workers
+    inherit the results copy-on-write.
+    """
+    with app.app_context():
+        snapshot = catalog_registry.reload()
+        career_cache.load()
+        career_cache.ids_for(snapshot)
+        db.session.commit()
+        question_cache.get()
+        answer_codec.load()
+        if app.config['RECOMMENDATION_LOOKUP_TABLE']:
+            from services.answer_table import get_answer_table
+            get_answer_table(catalog_registry.get().engine, app.config['RECOMMENDATION_LOOKUP_MAX_COMBINATIONS'])
 
 
 if __name__ == '__main__':
+    app = create_app()
+    init_database(app)
+    warm_caches(app)
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,163 @@
+import threading
+import time
+from flask import current_app, g, jsonify, request
+
+# Classes of unmarked views: GET/HEAD are reads, everything else writes
+READS = 'reads'
+WRITES = 'writes'
+
+
+def admission_class(name):
+    """Declare which admission class (auth, scoring, admin, ...) a route belongs to.
+
+    Only records the class on the view; AdmissionControl reads it before
+    the request runs.
+    """
+    def decorator(f):
+        f.admission_class = name
+        return f
+    return decorator
+
+
+def parse_class_limits(text):
+    """Parse 'auth=2,scoring=2' into {'auth': 2, 'scoring': 2}"""
+    limits = {}
+    for item in text.split(','):
+        if item.strip():
+            name, _, limit = item.partition('=')
+            limits[name.strip()] = int(limit)
+    return limits
+
+
+class AdmissionClass:
+    """In-flight cap for one class of endpoints, with a short bounded wait queue"""
+
+    def __init__(self, name, limit, queue_size, queue_timeout):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = self.queued = self.rejected = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Take a slot, waiting up to queue_timeout behind a full class; False means shed"""
+        with self._condition:
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                self.admitted += 1
+                return True
+            if self.waiting >= self.queue_size:
+                self.rejected += 1
+                return False
+            self.waiting += 1
+            self.queued += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.in_flight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+
+class AdmissionControl:
+    """Caps concurrent requests per endpoint class and sheds the excess with 503.
+
+    Expensive classes (scrypt logins, scoring, admin exports) each get a
+    few of a worker's request threads; a request over the cap waits at
+    most `queue_timeout` in a queue of `queue_size`, then is answered 503
+    with Retry-After instead of holding a thread. Classes without a limit
+    (by default reads and writes) are never held back, so cheap reads stay
+    fast while a login surge is shed. Counts are per process. Installs no
+    hooks unless ADMISSION_CONTROL_ENABLED is set.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.retry_after = 1
+        self._classes = {}
+
+    def init_app(self, app):
+        self.enabled = app.config.get('ADMISSION_CONTROL_ENABLED', False)
+        self.retry_after = app.config.get('ADMISSION_RETRY_AFTER', self.retry_after)
+        self._classes = {
+            name: AdmissionClass(name, limit, app.config.get('ADMISSION_QUEUE_SIZE', 4),
+                                 app.config.get('ADMISSION_QUEUE_TIMEOUT', 1.0))
+            for name, limit in app.config.get('ADMISSION_LIMITS', {}).items() if limit > 0
+        }
+        app.extensions['admission_control'] = self
+        if not self.enabled:
+            return
+        app.before_request(self._admit)
+        app.teardown_request(self._release)
+
+    def classify(self, view, method):
+        """Admission class of a view: declared (admin_required declares admin), else by method"""
+        name = getattr(view, 'admission_class', None)
+        if name is None:
+            name = READS if method in ('GET', 'HEAD') else WRITES
+        return name
+
+    def _admit(self):
+        view = current_app.view_functions.get(request.endpoint)
+        if view is None:
+            return None
+        admission = self._classes.get(self.classify(view, request.method))
+        if admission is None:
+            return None
+        if not admission.acquire():
+            return jsonify({'error': 'Server is busy, please retry shortly'}), 503, {
+                'Retry-After': str(self.retry_after)
+            }
+        g._admission = admission
+        return None
+
+    def _release(self, exc):
+        admission = g.pop('_admission', None)
+        if admission is not None:
+            admission.release()
+
+    def stats(self):
+        return {
+            name: {
+                'limit': admission.limit,
+                'in_flight': admission.in_flight,
+                'waiting': admission.waiting,
+                'admitted': admission.admitted,
+                'queued': admission.queued,
+                'rejected': admission.rejected
+            } for name, admission in self._classes.items()
+        }
+
+    def metrics_lines(self):
+        """Prometheus exposition lines for RequestMetrics.register_collector"""
+        stats = self.stats()
+        lines = []
+        for metric, kind, key, help_text in (
+            ('admission_in_flight', 'gauge', 'in_flight', 'Requests running per admission class.'),
+            ('admission_queue_depth', 'gauge', 'waiting', 'Requests waiting for a slot per admission class.'),
+            ('admission_limit', 'gauge', 'limit', 'In-flight cap per admission class.'),
+            ('admission_admitted_total', 'counter', 'admitted', 'Requests admitted per admission class.'),
+            ('admission_queued_total', 'counter', 'queued', 'Requests that waited for a slot per admission class.'),
+            ('admission_rejected_total', 'counter', 'rejected', 'Requests shed with 503 per admission class.'),
+        ):
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+            lines += [f'{metric}{{class="{name}"}} {values[key]}' for name, values in stats.items()]
+        return lines
+
+
+admission_control = AdmissionControl()
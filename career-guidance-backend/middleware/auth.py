@@ -19,6 +19,8 @@ def admin_required(f):
         if session.get('user_role') != 'admin':
             return jsonify({'error': 'Admin access required'}), 403
         return f(*args, **kwargs)
+    # Admin routes share one admission class (see middleware/admission.py)
+    decorated_function.admission_class = 'admin'
     return decorated_function
 
 def get_current_user_id():
@@ -0,0 +1,170 @@
+import bisect
+import threading
+import time
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_STATEMENTS_LOGGED = 5
+
+
+class EndpointStats:
+    __slots__ = ('buckets', 'count', 'duration', 'queries', 'query_time', 'statuses')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.query_time = 0.0
+        self.statuses = {}
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    """Per-endpoint latency histograms and SQL counts, exposed as Prometheus text.
+
+    Hooks Flask's request lifecycle and SQLAlchemy's cursor events only when
+    METRICS_ENABLED is set; otherwise init_app registers nothing and adds
+    no per-request work. Figures are per process.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_request_seconds = None
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._collectors = []
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', False)
+        app.extensions['request_metrics'] = self
+        if not self.enabled:
+            return
+        slow_ms = app.config.get('SLOW_REQUEST_MS')
+        self.slow_request_seconds = slow_ms / 1000 if slow_ms else None
+        self._logger = app.logger
+
+        app.before_request(self._start_request)
+        app.teardown_request(self._finish_request)
+        app.after_request(self._record_status)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    def register_collector(self, collector):
+        """Add a callable returning extra Prometheus exposition lines"""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def _start_request(self):
+        g._metrics = {
+            'start': time.perf_counter(),
+            'queries': 0,
+            'query_time': 0.0,
+            'statements': [] if self.slow_request_seconds is not None else None,
+            'status': 500,
+        }
+
+    def _record_status(self, response):
+        state = g.get('_metrics')
+        if state is not None:
+            state['status'] = response.status_code
+        return response
+
+    def _finish_request(self, exc=None):
+        state = g.pop('_metrics', None)
+        if state is None:
+            return
+        duration = time.perf_counter() - state['start']
+        endpoint = request.endpoint or 'unmatched'
+        key = (endpoint, request.method)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats()
+            stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+            stats.count += 1
+            stats.duration += duration
+            stats.queries += state['queries']
+            stats.query_time += state['query_time']
+            stats.statuses[state['status']] = stats.statuses.get(state['status'], 0) + 1
+
+        if self.slow_request_seconds is not None and duration >= self.slow_request_seconds:
+            slowest = sorted(state['statements'], key=lambda item: item[1], reverse=True)
+            self._logger.warning(
+                'Slow request %s %s (%s): %.1f ms, %d queries, %.1f ms in SQL; slowest: %s',
+                request.method, request.path, endpoint, duration * 1000,
+                state['queries'], state['query_time'] * 1000,
+                ' | '.join(f'{elapsed * 1000:.1f} ms {statement}' for statement, elapsed in slowest[:SLOW_STATEMENTS_LOGGED])
+            )
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            snapshot = [(key, stats, list(stats.buckets), dict(stats.statuses)) for key, stats in sorted(self._stats.items())]
+
+        lines = [
+            '# HELP http_request_duration_seconds Request latency by endpoint.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (endpoint, method), stats, buckets, _ in snapshot:
+            labels = f'endpoint="{_label(endpoint)}",method="{method}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {stats.duration:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+        lines += ['# HELP http_requests_total Requests by endpoint and status.', '# TYPE http_requests_total counter']
+        for (endpoint, method), _, _, statuses in snapshot:
+            for status, count in sorted(statuses.items()):
+                lines.append(f'http_requests_total{{endpoint="{_label(endpoint)}",method="{method}",status="{status}"}} {count}')
+
+        lines += ['# HELP db_queries_total SQL statements issued by endpoint.', '# TYPE db_queries_total counter']
+        for (endpoint, method), stats, _, _ in snapshot:
+            lines.append(f'db_queries_total{{endpoint="{_label(endpoint)}",method="{method}"}} {stats.queries}')
+
+        lines += ['# HELP db_query_duration_seconds_total Time spent in SQL by endpoint.', '# TYPE db_query_duration_seconds_total counter']
+        for (endpoint, method), stats, _, _ in snapshot:
+            lines.append(f'db_query_duration_seconds_total{{endpoint="{_label(endpoint)}",method="{method}"}} {stats.query_time:.6f}')
+
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and '_metrics' in g:
+        conn.info.setdefault('_metrics_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('_metrics_started')
+    if not started or not has_request_context():
+        return
+    elapsed = time.perf_counter() - started.pop()
+    state = g.get('_metrics')
+    if state is None:
+        return
+    state['queries'] += 1
+    state['query_time'] += elapsed
+    if state['statements'] is not None:
+        state['statements'].append((statement, elapsed))
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,70 @@
+from functools import wraps
+from sqlalchemy import event
+from models.user import db
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block issues more SQL statements than its budget"""
+
+
+def query_budget(limit):
+    """Declare the most SQL statements one request to this route may issue.
+
+    Only records the budget on the view; counting happens in tests and the
+    budget check, so production requests pay nothing for it.
+    """
+    def decorator(f):
+        f.query_budget = limit
+        return f
+    return decorator
+
+
+def get_query_budget(view):
+    """Return the budget declared on a view function, or None"""
+    return getattr(view, 'query_budget', None)
+
+
+class QueryCounter:
+    """Count the SQL statements executed on an engine while active.
+
+    Use as a context manager around test client calls, or as a decorator.
+    With a budget set, leaving the block after more statements than the
+    budget raises QueryBudgetExceeded listing what ran.
+    """
+
+    def __init__(self, budget=None, engine=None, label=None):
+        self.budget = budget
+        self.engine = engine
+        self.label = label
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self._engine = self.engine or db.engine
+        self.statements = []
+        event.listen(self._engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self._engine, 'before_cursor_execute', self._record)
+        if exc_type is None and self.budget is not None and self.count > self.budget:
+            raise QueryBudgetExceeded(self.report())
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def decorated_function(*args, **kwargs):
+            with QueryCounter(self.budget, self.engine, self.label or func.__name__):
+                return func(*args, **kwargs)
+        return decorated_function
+
+    def report(self):
+        lines = [f'{self.label or "block"}: {self.count} queries (budget {self.budget})']
+        lines += [f'  {index}. {" ".join(statement.split())}' for index, statement in enumerate(self.statements, 1)]
+        return '\n'.join(lines)
@@ -0,0 +1,98 @@
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from models.user import db
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+UPSERT_DIALECTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def upsert_row(model, values, key_columns):
+    """Insert a row or update the one matching key_columns, returning its primary key.
+
+    Runs as a single INSERT ... ON CONFLICT statement where the dialect
+    supports it and falls back to delete + insert elsewhere. The caller
+    owns the transaction.
+    """
+    dialect = db.session.get_bind().dialect.name
+    dialect_insert = UPSERT_DIALECTS.get(dialect)
+    if dialect_insert is not None:
+        stmt = dialect_insert(model).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={key: stmt.excluded[key] for key in values if key not in key_columns}
+        )
+        return db.session.execute(stmt.returning(model.id)).scalar_one()
+
+    db.session.query(model).filter_by(**{key: values[key] for key in key_columns}).delete()
+    row = model(**values)
+    db.session.add(row)
+    db.session.flush()
+    return row.id
+
+
+def bulk_insert(model, rows, key_column):
+    """Insert many rows in one multi-row statement, returning {key: primary key}.
+
+    key_column must be unique within rows. Matching RETURNING rows by key
+    instead of by position lets SQLite send every row in a single INSERT;
+    asking for parameter order would make it fall back to one INSERT per row.
+    """
+    if not rows:
+        return {}
+    key = getattr(model, key_column)
+    if db.session.get_bind().dialect.insert_executemany_returning:
+        stmt = insert(model).returning(key, model.id)
+        return {row_key: row_id for row_key, row_id in db.session.execute(stmt, rows)}
+
+    # No RETURNING for executemany: let the ORM assign ids row by row
+    objects = [model(**row) for row in rows]
+    db.session.add_all(objects)
+    db.session.flush()
+    return {getattr(obj, key_column): obj.id for obj in objects}
+
+
+def bulk_increment(model, rows, key_columns, value_column):
+    """Add each row's value_column to the row matching key_columns, inserting missing ones.
+
+    One INSERT ... ON CONFLICT DO UPDATE executemany where the dialect
+    supports it, else an UPDATE per row followed by an INSERT when nothing
+    matched. The caller owns the transaction.
+    """
+    if not rows:
+        return
+    dialect_insert = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if dialect_insert is not None:
+        stmt = dialect_insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={value_column: getattr(model, value_column) + stmt.excluded[value_column]}
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    column = getattr(model, value_column)
+    for row in rows:
+        matched = db.session.query(model).filter_by(**{key: row[key] for key in key_columns}).update(
+            {value_column: column + row[value_column]}, synchronize_session=False
+        )
+        if not matched:
+            db.session.execute(insert(model), [row])
+
+
+def delete_returning(model, columns, *criteria):
+    """Delete the rows matching criteria, returning their columns as they were.
+
+    One DELETE ... RETURNING where the dialect supports it, so the rows
+    returned are exactly the rows this transaction removed even when
+    another writer races it; else a SELECT followed by the DELETE. The
+    caller owns the transaction.
+    """
+    selected = [getattr(model, column) for column in columns]
+    if db.session.get_bind().dialect.delete_returning:
+        return db.session.execute(delete(model).where(*criteria).returning(*selected)).all()
+    rows = db.session.execute(select(*selected).where(*criteria)).all()
+    db.session.execute(delete(model).where(*criteria))
+    return rows
@@ -0,0 +1,189 @@
+import json
+from datetime import datetime
+from sqlalchemy import bindparam, column, func, inspect, select, table, text, update
+from models.user import db
+
+
+class SchemaMigration(db.Model):
+    version = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+def add_column_if_missing(table_name, column_name, column_ddl):
+    """Add a nullable column to an existing table (create_all never alters tables)"""
+    columns = {column['name'] for column in inspect(db.engine).get_columns(table_name)}
+    if column_name not in columns:
+        db.session.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {column_name} {column_ddl}'))
+
+
+def add_recommendation_fingerprint():
+    add_column_if_missing('career_recommendation', 'answers_fingerprint', 'VARCHAR(64)')
+
+
+def unique_quiz_response_per_user():
+    # Keep only the newest response per user before enforcing uniqueness
+    db.session.execute(text(
+        'DELETE FROM quiz_response WHERE id NOT IN '
+        '(SELECT MAX(id) FROM quiz_response GROUP BY user_id)'
+    ))
+    db.session.execute(text(
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_quiz_response_user_id ON quiz_response (user_id)'
+    ))
+
+
+def create_model_indexes():
+    # Indexes declared in each model's __table_args__
+    connection = db.session.connection()
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def normalize_recommendation_careers():
+    # Fresh databases from create_all already have career_id and no copies
+    columns = {column['name'] for column in inspect(db.engine).get_columns('career_recommendation')}
+    if 'details' not in columns:
+        return
+    from models.bulk import upsert_row
+    from models.user import Career
+    from services.careers import career_values
+
+    # SQLite cannot add a NOT NULL column without rebuilding the table;
+    # every row is backfilled below
+    add_column_if_missing('career_recommendation', 'career_id', 'INTEGER REFERENCES career (id)')
+    recommendations = table('career_recommendation', column('career'), column('description'),
+                            column('details'), column('career_id'))
+    distinct = select(recommendations.c.career, recommendations.c.description, recommendations.c.details).distinct()
+    for name, description, details in db.session.execute(distinct).all():
+        career_id = upsert_row(Career, career_values(name, description, json.loads(details) if details else {}),
+                               ['content_hash'])
+        db.session.execute(update(recommendations).where(
+            recommendations.c.career == name,
+            recommendations.c.description.is_not_distinct_from(description),
+            recommendations.c.details.is_not_distinct_from(details)
+        ).values(career_id=career_id))
+    for name in ('career', 'description', 'details'):
+        db.session.execute(text(f'ALTER TABLE career_recommendation DROP COLUMN {name}'))
+
+
+def rebuild_table(model):
+    """Recreate a table from its model definition, keeping its rows.
+
+    SQLite cannot change a column's constraints in place; the documented
+    way is to build the new table and copy the rows across.
+    """
+    model_table = model.__table__
+    old_name = f'{model_table.name}_old'
+    columns = {column['name'] for column in inspect(db.engine).get_columns(model_table.name)}
+    shared = ', '.join(column.name for column in model_table.columns if column.name in columns)
+    connection = db.session.connection()
+    db.session.execute(text(f'ALTER TABLE {model_table.name} RENAME TO {old_name}'))
+    for index in model_table.indexes:
+        db.session.execute(text(f'DROP INDEX IF EXISTS {index.name}'))
+    model_table.create(connection)
+    db.session.execute(text(f'INSERT INTO {model_table.name} ({shared}) SELECT {shared} FROM {old_name}'))
+    db.session.execute(text(f'DROP TABLE {old_name}'))
+
+
+def pack_quiz_answers():
+    from models.user import AnswerOption, Question, QuizResponse
+    from services.answer_codec import add_question_options, answer_codec
+
+    add_column_if_missing('quiz_response', 'answer_codes', 'BLOB')
+    # answers becomes nullable: packed responses no longer keep the JSON copy
+    answers_column = next(column for column in inspect(db.engine).get_columns('quiz_response')
+                          if column['name'] == 'answers')
+    if not answers_column['nullable']:
+        if db.session.get_bind().dialect.name == 'sqlite':
+            rebuild_table(QuizResponse)
+        else:
+            db.session.execute(text('ALTER TABLE quiz_response ALTER COLUMN answers DROP NOT NULL'))
+
+    known = {question_id for question_id, in db.session.query(AnswerOption.question_id).distinct()}
+    for question in Question.query.all():
+        if question.id not in known:
+            add_question_options(question.id, json.loads(question.options))
+    db.session.flush()
+    answer_codec.invalidate()
+
+    # Responses that do not match the current questions keep their JSON
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(QuizResponse.id, QuizResponse.answers)
+            .where(QuizResponse.id > last_id, QuizResponse.answer_codes.is_(None))
+            .order_by(QuizResponse.id).limit(1000)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        packed = []
+        for row in rows:
+            answer_codes = answer_codec.encode(json.loads(row.answers), strict=False)
+            if answer_codes is not None:
+                packed.append({'response_id': row.id, 'answer_codes': answer_codes})
+        if packed:
+            db.session.execute(
+                update(QuizResponse.__table__)
+                .where(QuizResponse.__table__.c.id == bindparam('response_id'))
+                .values(answer_codes=bindparam('answer_codes'), answers=None),
+                packed
+            )
+
+
+def backfill_analytics():
+    # create_all added the empty table; count what is already stored
+    from services.analytics import rebuild_counters
+    rebuild_counters()
+
+
+def never_reuse_question_ids():
+    if db.session.get_bind().dialect.name != 'sqlite':
+        return  # Other databases never hand out a sequence value twice
+    from models.user import AnswerOption, Question
+
+    ddl = db.session.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'question'")).scalar()
+    if 'AUTOINCREMENT' not in ddl.upper():
+        rebuild_table(Question)
+    # Ids of questions deleted before this migration still have answer_option rows
+    highest = db.session.query(func.max(AnswerOption.question_id)).scalar()
+    if highest is None:
+        return
+    sequence = db.session.execute(text("SELECT seq FROM sqlite_sequence WHERE name = 'question'")).scalar()
+    if sequence is None:
+        db.session.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('question', :seq)"), {'seq': highest})
+    elif sequence < highest:
+        db.session.execute(text("UPDATE sqlite_sequence SET seq = :seq WHERE name = 'question'"), {'seq': highest})
+
+
+def rank_recommendations_by_index():
+    # ORDER BY score DESC, id needs the descending score in the index to avoid a sort
+    db.session.execute(text('DROP INDEX IF EXISTS ix_career_recommendation_user_id_score'))
+    create_model_indexes()
+
+
+# Ordered (version, name, function) list. Every migration must be safe to run
+# against a database freshly created by db.create_all().
+MIGRATIONS = [
+    (1, 'Add career_recommendation.answers_fingerprint', add_recommendation_fingerprint),
+    (2, 'Unique quiz_response.user_id', unique_quiz_response_per_user),
+    (3, 'Indexes for per-user reads, admin listings and exports', create_model_indexes),
+    (4, 'Move career details from career_recommendation to career', normalize_recommendation_careers),
+    (5, 'Pack quiz_response.answers into answer_codes', pack_quiz_answers),
+    (6, 'Backfill analytics counters', backfill_analytics),
+    (7, 'Never reuse question ids', never_reuse_question_ids),
+    (8, 'Index recommendations by user, score descending and id', rank_recommendations_by_index),
+]
+
+
+def upgrade_database():
+    """Create missing tables and apply pending migrations in order"""
+    db.create_all()
+    applied = {row.version for row in SchemaMigration.query.all()}
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        migrate()
+        db.session.add(SchemaMigration(version=version, name=name))
+        db.session.commit()
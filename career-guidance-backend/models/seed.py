@@ -0,0 +1,85 @@
+import json
+from models.user import Question, db
+from services.answer_codec import add_question_options
+from services.question_cache import question_cache
+
+DEFAULT_QUESTIONS = [
+    {
+        'question_text': 'Which type of activities do you find most engaging?',
+        'category': 'interests',
+        'options': [
+            {'value': 'analytical', 'label': 'Analyzing data and solving complex problems'},
+            {'value': 'creative', 'label': 'Creating and designing new things'},
+            {'value': 'social', 'label': 'Working with and helping people'},
+            {'value': 'practical', 'label': 'Building and fixing things with your hands'}
+        ]
+    },
+    {
+        'question_text': 'How do you prefer to work?',
+        'category': 'personality',
+        'options': [
+            {'value': 'team', 'label': 'In a collaborative team environment'},
+            {'value': 'independent', 'label': 'Independently with minimal supervision'},
+            {'value': 'leadership', 'label': 'Leading and directing others'},
+            {'value': 'structured', 'label': 'In a structured, organized setting'}
+        ]
+    },
+    {
+        'question_text': 'Which subject area interests you most?',
+        'category': 'academic',
+        'options': [
+            {'value': 'stem', 'label': 'Science, Technology, Engineering, Math'},
+            {'value': 'humanities', 'label': 'Literature, History, Philosophy'},
+            {'value': 'arts', 'label': 'Visual Arts, Music, Theater'},
+            {'value': 'business', 'label': 'Business, Economics, Finance'}
+        ]
+    },
+    {
+        'question_text': 'What is your greatest strength?',
+        'category': 'skills',
+        'options': [
+            {'value': 'communication', 'label': 'Communication and interpersonal skills'},
+            {'value': 'technical', 'label': 'Technical and analytical abilities'},
+            {'value': 'creativity', 'label': 'Creative thinking and innovation'},
+            {'value': 'organization', 'label': 'Organization and attention to detail'}
+        ]
+    },
+    {
+        'question_text': 'What type of work environment appeals to you?',
+        'category': 'environment',
+        'options': [
+            {'value': 'office', 'label': 'Traditional office setting'},
+            {'value': 'remote', 'label': 'Remote or flexible workspace'},
+            {'value': 'outdoors', 'label': 'Outdoor or field work'},
+            {'value': 'laboratory', 'label': 'Laboratory or research facility'}
+        ]
+    },
+    {
+        'question_text': 'What motivates you most in your career?',
+        'category': 'values',
+        'options': [
+            {'value': 'impact', 'label': 'Making a positive impact on society'},
+            {'value': 'growth', 'label': 'Personal and professional growth'},
+            {'value': 'stability', 'label': 'Job security and stability'},
+            {'value': 'innovation', 'label': 'Innovation and cutting-edge work'}
+        ]
+    }
+]
+
+
+def seed_default_questions():
+    """Insert the default quiz questions if none exist; return how many were added"""
+    if Question.query.count() > 0:
+        return 0
+    for q_data in DEFAULT_QUESTIONS:
+        question = Question(
+            question_text=q_data['question_text'],
+            category=q_data['category'],
+            options=json.dumps(q_data['options'])
+        )
+        db.session.add(question)
+        db.session.flush()
+        add_question_options(question.id, q_data['options'])
+    db.session.commit()
+    question_cache.invalidate()
+    return len(DEFAULT_QUESTIONS)
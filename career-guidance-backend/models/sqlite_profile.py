@@ -0,0 +1,68 @@
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+class SQLiteProfile:
+    """Connection pragmas and pool sizing for SQLite under concurrent load.
+
+    WAL journaling lets readers proceed while a writer commits, and
+    busy_timeout makes writers wait for the lock instead of failing with
+    "database is locked". Pragmas are applied to every new DBAPI
+    connection; other databases are left untouched. Call init_app before
+    db.init_app so the pool options reach the engine.
+    """
+
+    def __init__(self):
+        self.pragmas = None
+        self._listening = False
+
+    def init_app(self, app):
+        config = app.config
+        url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+        app.extensions['sqlite_profile'] = self
+        self.pragmas = None
+        if url.get_backend_name() != 'sqlite':
+            return
+
+        journal_mode = config.get('SQLITE_JOURNAL_MODE', 'WAL').upper()
+        synchronous = config.get('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+        if journal_mode not in JOURNAL_MODES:
+            raise ValueError(f'SQLITE_JOURNAL_MODE must be one of {", ".join(JOURNAL_MODES)}')
+        if synchronous not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f'SQLITE_SYNCHRONOUS must be one of {", ".join(SYNCHRONOUS_LEVELS)}')
+        self.pragmas = [
+            ('journal_mode', journal_mode),
+            ('synchronous', synchronous),
+            ('busy_timeout', int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))),
+            # Negative cache_size is in KiB rather than pages
+            ('cache_size', -int(config.get('SQLITE_CACHE_SIZE_KB', 65536))),
+            ('mmap_size', int(config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))),
+        ]
+
+        # In-memory databases use a single-connection pool that takes no sizing
+        if url.database and url.database != ':memory:':
+            options = config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+            options.setdefault('pool_size', int(config.get('SQLITE_POOL_SIZE', 5)))
+            options.setdefault('max_overflow', int(config.get('SQLITE_MAX_OVERFLOW', 10)))
+            options.setdefault('pool_timeout', float(config.get('SQLITE_POOL_TIMEOUT', 30)))
+
+        if not self._listening:
+            event.listen(Engine, 'connect', self._on_connect)
+            self._listening = True
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        if self.pragmas is None or not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas:
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+
+
+sqlite_profile = SQLiteProfile()
@@ -1,6 +1,7 @@
+import json
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from services.password_hashing import password_hasher
 
 db = SQLAlchemy()
 
@@ -21,10 +22,13 @@ class User(db.Model):
         return f'<User {self.name}>'
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
 
     def to_dict(self):
         return {
@@ -36,40 +40,71 @@ class User(db.Model):
         }
 
 class QuizResponse(db.Model):
+    __table_args__ = (
+        # One current response per user, replaced in place by an upsert
+        db.Index('uq_quiz_response_user_id', 'user_id', unique=True),
+        db.Index('ix_quiz_response_timestamp', 'timestamp', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    answers = db.Column(db.Text, nullable=False)  # JSON string of answers
+    answer_codes = db.Column(db.LargeBinary)  # Packed answer_option ids (services/answer_codec.py)
+    answers = db.Column(db.Text)  # JSON string of answers that could not be encoded
     
     def to_dict(self):
+        # answer_codes is decoded into answers by the answer codec
         return {
             'id': self.id,
             'user_id': self.user_id,
             'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'answer_codes': self.answer_codes,
             'answers': self.answers
         }
 
+class Career(db.Model):
+    """A career as the catalog described it; rows are never updated.
+
+    Editing a career in the catalog adds a new row (keyed by content_hash),
+    so recommendations keep the details they were scored with.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    details = db.Column(db.Text)  # JSON string of detailed information
+    content_hash = db.Column(db.String(64), unique=True, nullable=False)  # Hash of name, description and details
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class CareerRecommendation(db.Model):
+    __table_args__ = (
+        # Best first, in ranking order between equal scores
+        db.Index('ix_career_recommendation_user_id_score_id', 'user_id', db.text('score DESC'), 'id'),
+        db.Index('ix_career_recommendation_created_at', 'created_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    career = db.Column(db.String(100), nullable=False)
+    career_id = db.Column(db.Integer, db.ForeignKey('career.id'), nullable=False)
     score = db.Column(db.Float, nullable=False)
-    description = db.Column(db.Text)
-    details = db.Column(db.Text)  # JSON string of detailed information
+    answers_fingerprint = db.Column(db.String(64))  # Answers + catalog version these were scored from
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
+        # Name, description and details come from the career cache (services/careers.py)
         return {
             'id': self.id,
             'user_id': self.user_id,
-            'career': self.career,
+            'career_id': self.career_id,
             'score': self.score,
-            'description': self.description,
-            'details': self.details,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
 class Feedback(db.Model):
+    __table_args__ = (
+        db.Index('ix_feedback_user_id_date', 'user_id', 'date'),
+        db.Index('ix_feedback_date_id', 'date', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     message = db.Column(db.Text, nullable=False)
@@ -84,6 +119,9 @@ class Feedback(db.Model):
         }
 
 class Question(db.Model):
+    # Ids are never reused: answer_option rows and packed answers outlive a deleted question
+    __table_args__ = {'sqlite_autoincrement': True}
+
     id = db.Column(db.Integer, primary_key=True)
     question_text = db.Column(db.Text, nullable=False)
     category = db.Column(db.String(50), nullable=False)
@@ -98,3 +136,64 @@ class Question(db.Model):
             'options': self.options,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+class AnswerOption(db.Model):
+    """One option of a quiz question, as stored in packed quiz answers.
+
+    Rows are never updated or deleted, so responses to deleted questions
+    still decode; question ids are never reused, so they cannot collide
+    with a later question's options.
+    """
+    __table_args__ = (
+        db.Index('uq_answer_option_question_id_position', 'question_id', 'position', unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    question_id = db.Column(db.Integer, nullable=False)  # No foreign key: outlives its question
+    position = db.Column(db.Integer, nullable=False)  # Index in the question's options list
+    value = db.Column(db.Text, nullable=False)  # JSON-encoded option value
+
+class AnalyticsCounter(db.Model):
+    """One incrementally maintained count behind GET /api/analytics.
+
+    period is 'all' for the running total or the ISO day the counted rows
+    were written. Metrics and keys are described in services/analytics.py;
+    `flask analytics rebuild` recomputes every row from the source tables.
+    """
+    period = db.Column(db.String(10), primary_key=True)
+    metric = db.Column(db.String(20), primary_key=True)
+    key = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Career or answer option id, else 0
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class GenerationJob(db.Model):
+    __table_args__ = (
+        # At most one queued or running job per user; repeated requests join it
+        db.Index('uq_generation_job_active_user', 'user_id', unique=True,
+                 sqlite_where=db.text("status IN ('queued', 'running')"),
+                 postgresql_where=db.text("status IN ('queued', 'running')")),
+        db.Index('ix_generation_job_user_id_status', 'user_id', 'status'),
+        db.Index('ix_generation_job_status_created_at', 'status', 'created_at'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)  # Random hex, handed to the client to poll
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    result = db.Column(db.Text)  # JSON body the synchronous endpoint would have returned
+    result_status = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'status': self.status,
+            'result': json.loads(self.result) if self.result else None,
+            'result_status': self.result_status,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
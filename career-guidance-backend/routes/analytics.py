@@ -0,0 +1,18 @@
+from flask import Blueprint, jsonify, request
+from middleware.auth import admin_required
+from middleware.query_budget import query_budget
+from services.analytics import AnalyticsError, analytics_summary
+
+analytics_bp = Blueprint('analytics', __name__)
+
+@analytics_bp.route('/analytics', methods=['GET'])
+@query_budget(2)
+@admin_required
+def get_analytics():
+    """Get recommendation and answer counts, optionally for a since/until day range (admin only)"""
+    try:
+        return jsonify(analytics_summary(request.args.get('since'), request.args.get('until'))), 200
+    except AnalyticsError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -2,13 +2,18 @@ from flask import Blueprint, jsonify, request, session
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from models.user import User, db
+from middleware.admission import admission_class
 from middleware.auth import login_required
+from middleware.query_budget import query_budget
 from schemas.validation import validate_request_data, UserRegistrationSchema, UserLoginSchema
+from services.password_hashing import PasswordHasherBusy
 import json
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/register', methods=['POST'])
+@query_budget(2)
+@admission_class('auth')
 def register():
     """Register a new user"""
     try:
@@ -34,23 +39,31 @@ def register():
         )
         user.set_password(validated_data['password'])
         
+        # Serialize before commit so the response doesn't reload the row
         db.session.add(user)
+        db.session.flush()
+        user_data = user.to_dict()
         db.session.commit()
         
         # Store user in session
-        session['user_id'] = user.id
-        session['user_role'] = user.role
+        session['user_id'] = user_data['id']
+        session['user_role'] = user_data['role']
         
         return jsonify({
             'message': 'User registered successfully',
-            'user': user.to_dict()
+            'user': user_data
         }), 201
         
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@query_budget(2)
+@admission_class('auth')
 def login():
     """Login user"""
     try:
@@ -69,6 +82,11 @@ def login():
         if not user or not user.check_password(validated_data['password']):
             return jsonify({'error': 'Invalid email or password'}), 401
         
+        # Upgrade hashes made with an older method or cost on successful login
+        if user.password_needs_rehash():
+            user.set_password(validated_data['password'])
+            db.session.commit()
+        
         # Store user in session
         session['user_id'] = user.id
         session['user_role'] = user.role
@@ -78,10 +96,14 @@ def login():
             'user': user.to_dict()
         }), 200
         
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/logout', methods=['POST'])
+@query_budget(0)
 @login_required
 def logout():
     """Logout user"""
@@ -89,6 +111,7 @@ def logout():
     return jsonify({'message': 'Logout successful'}), 200
 
 @auth_bp.route('/me', methods=['GET'])
+@query_budget(1)
 @login_required
 def get_current_user():
     """Get current authenticated user"""
@@ -1,11 +1,16 @@
 from flask import Blueprint, jsonify, request, session
 from models.user import Feedback, db
 from middleware.auth import login_required, admin_required
+from middleware.query_budget import query_budget
 from schemas.validation import validate_request_data, FeedbackSchema
+from services.pagination import PaginationError, paginated_response
 
 feedback_bp = Blueprint('feedback', __name__)
 
+FEEDBACK_FIELDS = ['id', 'user_id', 'message', 'date']
+
 @feedback_bp.route('/feedback', methods=['POST'])
+@query_budget(1)
 @login_required
 def submit_feedback():
     """Submit user feedback"""
@@ -25,11 +30,13 @@ def submit_feedback():
         )
         
         db.session.add(feedback)
+        db.session.flush()
+        feedback_data = feedback.to_dict()
         db.session.commit()
         
         return jsonify({
             'message': 'Feedback submitted successfully',
-            'feedback': feedback.to_dict()
+            'feedback': feedback_data
         }), 201
         
     except Exception as e:
@@ -37,6 +44,7 @@ def submit_feedback():
         return jsonify({'error': str(e)}), 500
 
 @feedback_bp.route('/feedback', methods=['GET'])
+@query_budget(1)
 @login_required
 def get_user_feedback():
     """Get current user's feedback"""
@@ -47,16 +55,19 @@ def get_user_feedback():
         return jsonify({'error': str(e)}), 500
 
 @feedback_bp.route('/feedback/all', methods=['GET'])
+@query_budget(1)
 @admin_required
 def get_all_feedback():
-    """Get all feedback (admin only)"""
+    """Get all feedback, newest first, one keyset page at a time (admin only)"""
     try:
-        feedback_list = Feedback.query.order_by(Feedback.date.desc()).all()
-        return jsonify([feedback.to_dict() for feedback in feedback_list]), 200
+        return paginated_response(Feedback, FEEDBACK_FIELDS, ['date', 'id'], descending=True), 200
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @feedback_bp.route('/feedback/<int:feedback_id>', methods=['DELETE'])
+@query_budget(2)
 @admin_required
 def delete_feedback(feedback_id):
     """Delete feedback (admin only)"""
@@ -1,27 +1,45 @@
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, current_app, jsonify, request, session
+from sqlalchemy.exc import IntegrityError
 from models.user import Question, QuizResponse, db
+from models.bulk import bulk_insert
 from middleware.auth import login_required, admin_required
+from middleware.query_budget import query_budget
 from schemas.validation import validate_request_data, QuizResponseSchema, QuestionSchema
+from services.answer_codec import AnswerError, add_question_options, answer_codec
+from services.analytics import apply_counts, count_response, delete_response
+from services.answer_table import invalidate_answer_table
+from services.question_cache import question_cache
+from services.pagination import PaginationError, paginated_response
+from services.export import ExportError, export_response
+from collections import Counter
+from datetime import datetime
 import json
 
 quiz_bp = Blueprint('quiz', __name__)
 
+RESPONSE_FIELDS = ['id', 'user_id', 'timestamp', 'answers']
+# Answers are stored packed in answer_codes, or as JSON when they could not be encoded
+RESPONSE_ANSWER_FIELDS = {'answers': ('answer_codes', 'answers')}
+
 @quiz_bp.route('/questions', methods=['GET'])
+@query_budget(1)
 def get_questions():
     """Get all quiz questions"""
     try:
-        questions = Question.query.all()
-        questions_data = []
-        for question in questions:
-            question_dict = question.to_dict()
-            # Parse options JSON string back to list
-            question_dict['options'] = json.loads(question_dict['options'])
-            questions_data.append(question_dict)
-        return jsonify(questions_data), 200
+        body, etag = question_cache.get()
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        # Let browsers keep the body but revalidate it on every use
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @quiz_bp.route('/questions', methods=['POST'])
+@query_budget(2)
 @admin_required
 def create_question():
     """Create a new quiz question (admin only)"""
@@ -42,9 +60,15 @@ def create_question():
         )
         
         db.session.add(question)
+        db.session.flush()
+        question_dict = question.to_dict()
+        options = add_question_options(question.id, validated_data['options'])
         db.session.commit()
+        # Bumps the shared questions generation, so every worker drops its copies
+        generation = question_cache.invalidate()
+        answer_codec.add_question(question_dict['id'], options, generation)
+        invalidate_answer_table()
         
-        question_dict = question.to_dict()
         question_dict['options'] = json.loads(question_dict['options'])
         
         return jsonify({
@@ -57,6 +81,7 @@ def create_question():
         return jsonify({'error': str(e)}), 500
 
 @quiz_bp.route('/responses', methods=['POST'])
+@query_budget(3)
 @login_required
 def submit_quiz_response():
     """Submit quiz responses"""
@@ -70,21 +95,48 @@ def submit_quiz_response():
         if errors:
             return jsonify({'error': 'Validation failed', 'details': errors}), 400
         
-        # Delete previous responses for this user
-        QuizResponse.query.filter_by(user_id=session['user_id']).delete()
+        # Check the answers against the current questions and pack them
+        try:
+            answer_codes = answer_codec.encode(validated_data['answers'])
+        except AnswerError as e:
+            return jsonify({'error': 'Validation failed', 'details': {'answers': e.errors}}), 400
         
-        # Create new response
-        response = QuizResponse(
-            user_id=session['user_id'],
-            answers=json.dumps(validated_data['answers'])
-        )
-        
-        db.session.add(response)
+        # Replace this user's current response, keeping its id; the
+        # deleted one comes out of the analytics counts. Two first submits
+        # can both find nothing to delete: the loser retries and replaces
+        # the winner's response instead
+        for attempt in range(2):
+            previous = delete_response(session['user_id'])
+            response_data = {
+                'user_id': session['user_id'],
+                'timestamp': datetime.utcnow(),
+                'answer_codes': answer_codes,
+                'answers': None
+            }
+            if previous:
+                response_data['id'] = previous.id
+            try:
+                response_data['id'] = bulk_insert(QuizResponse, [response_data], 'user_id')[session['user_id']]
+                break
+            except IntegrityError:
+                db.session.rollback()
+                if attempt:
+                    raise
+        counts = Counter()
+        if previous:
+            count_response(counts, previous.answer_codes, previous.timestamp, -1)
+        count_response(counts, answer_codes, response_data['timestamp'])
+        apply_counts(counts)
         db.session.commit()
         
         return jsonify({
             'message': 'Quiz response submitted successfully',
-            'response': response.to_dict()
+            'response': {
+                'id': response_data['id'],
+                'user_id': response_data['user_id'],
+                'timestamp': response_data['timestamp'].isoformat(),
+                'answers': json.dumps(validated_data['answers'])
+            }
         }), 201
         
     except Exception as e:
@@ -92,26 +144,48 @@ def submit_quiz_response():
         return jsonify({'error': str(e)}), 500
 
 @quiz_bp.route('/responses', methods=['GET'])
+@query_budget(1)
 @login_required
 def get_user_responses():
     """Get current user's quiz responses"""
     try:
         responses = QuizResponse.query.filter_by(user_id=session['user_id']).all()
-        return jsonify([response.to_dict() for response in responses]), 200
+        return jsonify([answer_codec.expand(response.to_dict()) for response in responses]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @quiz_bp.route('/responses/all', methods=['GET'])
+@query_budget(1)
 @admin_required
 def get_all_responses():
-    """Get all quiz responses (admin only)"""
+    """Get all quiz responses, one keyset page at a time (admin only)"""
     try:
-        responses = QuizResponse.query.all()
-        return jsonify([response.to_dict() for response in responses]), 200
+        return paginated_response(
+            QuizResponse, RESPONSE_FIELDS, ['id'],
+            transform=answer_codec.expand, computed=RESPONSE_ANSWER_FIELDS
+        ), 200
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@quiz_bp.route('/responses/export', methods=['GET'])
+@query_budget(1)
+@admin_required
+def export_responses():
+    """Stream all quiz responses as NDJSON or CSV (admin only)"""
+    try:
+        return export_response(
+            QuizResponse, RESPONSE_FIELDS, 'quiz_responses', date_field='timestamp',
+            computed=RESPONSE_ANSWER_FIELDS, transform=answer_codec.expand
+        )
+    except ExportError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @quiz_bp.route('/questions/<int:question_id>', methods=['DELETE'])
+@query_budget(2)
 @admin_required
 def delete_question(question_id):
     """Delete a quiz question (admin only)"""
@@ -119,6 +193,9 @@ def delete_question(question_id):
         question = Question.query.get_or_404(question_id)
         db.session.delete(question)
         db.session.commit()
+        generation = question_cache.invalidate()
+        answer_codec.remove_question(question_id, generation)
+        invalidate_answer_table()
         return jsonify({'message': 'Question deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
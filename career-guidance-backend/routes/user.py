@@ -1,21 +1,34 @@
 from flask import Blueprint, jsonify, request
-from models.user import User, db
+from models.user import Feedback, GenerationJob, User, db
 from middleware.auth import admin_required, login_required
+from middleware.query_budget import query_budget
 from schemas.validation import validate_request_data, UserRegistrationSchema
+from services.analytics import (apply_counts, count_recommendations, count_response, delete_recommendations,
+                                delete_response)
+from services.pagination import PaginationError, paginated_response
+from services.password_hashing import PasswordHasherBusy
+from services.recommendation_cache import recommendation_cache
+from collections import Counter
 
 user_bp = Blueprint('user', __name__)
 
+# Columns admins may list; never expose password_hash
+USER_FIELDS = ['id', 'name', 'email', 'role', 'created_at']
+
 @user_bp.route('/users', methods=['GET'])
+@query_budget(1)
 @admin_required
 def get_users():
-    """Get all users (admin only)"""
+    """Get all users, one keyset page at a time (admin only)"""
     try:
-        users = User.query.all()
-        return jsonify([user.to_dict() for user in users]), 200
+        return paginated_response(User, USER_FIELDS, ['id']), 200
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/users', methods=['POST'])
+@query_budget(2)
 @admin_required
 def create_user():
     """Create a new user (admin only)"""
@@ -43,14 +56,20 @@ def create_user():
         user.set_password(validated_data['password'])
         
         db.session.add(user)
+        db.session.flush()
+        user_data = user.to_dict()
         db.session.commit()
         
-        return jsonify(user.to_dict()), 201
+        return jsonify(user_data), 201
         
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
+@query_budget(1)
 @admin_required
 def get_user(user_id):
     """Get a specific user (admin only)"""
@@ -61,6 +80,7 @@ def get_user(user_id):
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/users/<int:user_id>', methods=['PUT'])
+@query_budget(3)
 @admin_required
 def update_user(user_id):
     """Update a user (admin only)"""
@@ -83,20 +103,36 @@ def update_user(user_id):
         if 'role' in data and data['role'] in ['student', 'admin']:
             user.role = data['role']
         
+        user_data = user.to_dict()
         db.session.commit()
-        return jsonify(user.to_dict()), 200
+        return jsonify(user_data), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/users/<int:user_id>', methods=['DELETE'])
+@query_budget(7)
 @admin_required
 def delete_user(user_id):
     """Delete a user (admin only)"""
     try:
-        user = User.query.get_or_404(user_id)
-        db.session.delete(user)
+        User.query.get_or_404(user_id)
+        
+        # Bulk-delete dependent rows first; deleting through the ORM would
+        # load each relationship and null out the NOT NULL user_id columns.
+        # The deleted response and recommendations come out of the analytics counts
+        counts = Counter()
+        response = delete_response(user_id)
+        if response:
+            count_response(counts, response.answer_codes, response.timestamp, -1)
+        count_recommendations(counts, delete_recommendations([user_id]).get(user_id), -1)
+        for model in (Feedback, GenerationJob):
+            model.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        User.query.filter_by(id=user_id).delete()
+        apply_counts(counts)
         db.session.commit()
+        recommendation_cache.invalidate(user_id)
         return jsonify({'message': 'User deleted successfully'}), 200
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,188 @@
+import itertools
+from collections import Counter
+from datetime import date, timedelta
+from sqlalchemy import select
+from models.user import AnalyticsCounter, CareerRecommendation, QuizResponse, db
+from models.bulk import bulk_increment, delete_returning
+from services.answer_codec import answer_codec
+from services.careers import career_cache
+
+# Counters describe the current rows, bucketed by the day each row was written:
+RESPONSES = 'responses'  # quiz responses (key 0)
+ANSWERS = 'answers'  # responses choosing an answer option (key: answer_option id)
+RECOMMENDED_USERS = 'recommended_users'  # users with stored recommendations (key 0)
+CAREERS = 'careers'  # users recommended a career (key: career id)
+TOP_CAREERS = 'top_careers'  # users whose best-scored recommendation is a career (key: career id)
+
+ALL = 'all'
+DEFAULT_DAYS = 30
+
+
+class AnalyticsError(ValueError):
+    """Raised for malformed analytics date ranges"""
+
+
+def count_response(counts, answer_codes, timestamp, sign=1):
+    """Add (sign=1) or remove (sign=-1) one quiz response's counts.
+
+    Responses kept as JSON because they could not be packed count as
+    responses but not per option.
+    """
+    day = timestamp.date().isoformat()
+    counts[(day, RESPONSES, 0)] += sign
+    if answer_codes is not None:
+        for option_id in answer_codec.option_ids(answer_codes):
+            counts[(day, ANSWERS, option_id)] += sign
+
+
+def count_recommendations(counts, rows, sign=1):
+    """Add or remove one user's recommendations, given as [(career_id, created_at)] best first"""
+    if not rows:
+        return
+    day = rows[0][1].date().isoformat()
+    counts[(day, RECOMMENDED_USERS, 0)] += sign
+    counts[(day, TOP_CAREERS, rows[0][0])] += sign
+    for career_id, created_at in rows:
+        counts[(created_at.date().isoformat(), CAREERS, career_id)] += sign
+
+
+def apply_counts(counts):
+    """Write counted changes to the per-day and running-total rows; the caller commits"""
+    totals = Counter()
+    for (period, metric, key), value in counts.items():
+        totals[(ALL, metric, key)] += value
+    rows = [{'period': period, 'metric': metric, 'key': key, 'value': value}
+            for (period, metric, key), value in itertools.chain(counts.items(), totals.items()) if value]
+    bulk_increment(AnalyticsCounter, rows, ['period', 'metric', 'key'], 'value')
+
+
+def delete_response(user_id):
+    """Delete a user's quiz response; return its (id, answer_codes, timestamp) row for counting, or None"""
+    rows = delete_returning(QuizResponse, ['id', 'answer_codes', 'timestamp'], QuizResponse.user_id == user_id)
+    return rows[0] if rows else None
+
+
+def delete_recommendations(user_ids):
+    """Delete the users' stored recommendations; return {user_id: [(career_id, created_at)] best first}.
+
+    The counts to subtract come from the rows actually deleted, so two
+    writers replacing the same user's rows never both subtract them.
+    """
+    rows = delete_returning(CareerRecommendation, ['user_id', 'career_id', 'created_at', 'score', 'id'],
+                            CareerRecommendation.user_id.in_(user_ids))
+    rows.sort(key=lambda row: (row.user_id, -row.score, row.id))
+    return {user_id: [(row.career_id, row.created_at) for row in group]
+            for user_id, group in itertools.groupby(rows, key=lambda row: row.user_id)}
+
+
+def rebuild_counters(chunk_size=1000):
+    """Recompute every counter from quiz_response and career_recommendation; return rows written.
+
+    Runs in one transaction, so readers see either the old or the new counts.
+    """
+    db.session.query(AnalyticsCounter).delete()
+    counts = Counter()
+
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(QuizResponse.id, QuizResponse.answer_codes, QuizResponse.timestamp)
+            .where(QuizResponse.id > last_id).order_by(QuizResponse.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        for row in rows:
+            count_response(counts, row.answer_codes, row.timestamp)
+
+    recommendations = db.session.execute(
+        select(CareerRecommendation.user_id, CareerRecommendation.career_id, CareerRecommendation.created_at)
+        .order_by(CareerRecommendation.user_id, CareerRecommendation.score.desc(), CareerRecommendation.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for _, group in itertools.groupby(recommendations, key=lambda row: row.user_id):
+        count_recommendations(counts, [(row.career_id, row.created_at) for row in group])
+
+    apply_counts(counts)
+    db.session.commit()
+    return sum(1 for value in counts.values() if value)
+
+
+def parse_day(value, name):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise AnalyticsError(f'{name} must be an ISO 8601 date (YYYY-MM-DD)')
+
+
+def counter_query(metrics=None, since=None, until=None):
+    """Select (period, metric, key, value) counters: running totals, or per-day rows from since to until"""
+    stmt = select(AnalyticsCounter.period, AnalyticsCounter.metric, AnalyticsCounter.key, AnalyticsCounter.value)
+    if since is None:
+        stmt = stmt.where(AnalyticsCounter.period == ALL)
+    else:
+        # 'all' sorts after every ISO day, so the range never includes it
+        stmt = stmt.where(AnalyticsCounter.period >= since.isoformat(), AnalyticsCounter.period <= until.isoformat())
+    if metrics is not None:
+        stmt = stmt.where(AnalyticsCounter.metric.in_(metrics), AnalyticsCounter.key == 0)
+    return stmt
+
+
+def analytics_summary(since=None, until=None):
+    """Aggregate counts for the admin dashboard.
+
+    Without a range the running totals are read: one row per career and
+    answer option. since/until (inclusive ISO days) sum the per-day rows
+    instead; either bound may be omitted to leave that side open. The
+    daily series covers the range, with an open end stopping at today and
+    an open start reaching back DEFAULT_DAYS from its end.
+    """
+    if since is not None:
+        since = parse_day(since, 'since')
+    if until is not None:
+        until = parse_day(until, 'until')
+    ranged = since is not None or until is not None
+    series_until = until or date.today()
+    series_since = since or series_until - timedelta(days=DEFAULT_DAYS - 1)
+    if series_since > series_until:
+        raise AnalyticsError('since must not be after until')
+
+    totals = Counter()
+    if ranged:
+        # Per-day rows, summed here rather than with GROUP BY so the read stays an index range scan
+        stmt = counter_query(since=since or date.min, until=until or date.max)
+    else:
+        stmt = counter_query()
+    for _, metric, key, count in db.session.execute(stmt):
+        totals[(metric, key)] += count
+
+    careers = {}
+    for (metric, key), count in totals.items():
+        if metric in (CAREERS, TOP_CAREERS) and count:
+            # Catalog edits add career rows under the same name; report them together
+            entry = careers.setdefault(career_cache.get(key)['name'], {'recommended': 0, 'top_pick': 0})
+            entry['recommended' if metric == CAREERS else 'top_pick'] += count
+
+    daily = {}
+    for period, metric, key, count in db.session.execute(
+        counter_query([RESPONSES, RECOMMENDED_USERS], series_since, series_until)
+    ):
+        daily.setdefault(period, {RESPONSES: 0, RECOMMENDED_USERS: 0})[metric] = count
+
+    return {
+        'since': since.isoformat() if since else None,
+        'until': until.isoformat() if until else None,
+        'responses': totals.get((RESPONSES, 0), 0),
+        'recommended_users': totals.get((RECOMMENDED_USERS, 0), 0),
+        'careers': sorted(
+            ({'career': name, **entry} for name, entry in careers.items()),
+            key=lambda entry: (-entry['recommended'], -entry['top_pick'], entry['career'])
+        ),
+        'questions': [
+            {'question_id': int(key),
+             'options': [{'value': value, 'count': totals.get((ANSWERS, option_id), 0)}
+                         for option_id, value in options]}
+            for key, options in sorted(answer_codec.question_options().items(), key=lambda item: int(item[0]))
+        ],
+        'daily': [{'day': day, **daily[day]} for day in sorted(daily)]
+    }
@@ -0,0 +1,179 @@
+import json
+import struct
+import threading
+import time
+from models.user import AnswerOption, Question, db
+from models.bulk import bulk_insert
+from services.shared_cache import QUESTIONS, shared_cache
+
+# Reload the question set at most this often when a submission names an unknown question
+RELOAD_INTERVAL = 1.0
+
+
+class AnswerError(ValueError):
+    """Raised when submitted answers do not match the current questions"""
+
+    def __init__(self, errors):
+        super().__init__('Answers do not match the current questions')
+        self.errors = errors
+
+
+def option_key(value):
+    """Canonical JSON text of an option value, as stored in answer_option.value"""
+    return json.dumps(value, sort_keys=True)
+
+
+def add_question_options(question_id, options):
+    """Insert the answer_option rows for a new question; return [(option id, value)].
+
+    The caller owns the transaction and must call answer_codec.add_question
+    with the new questions generation after committing.
+    """
+    rows = [{'question_id': question_id, 'position': position, 'value': option_key(option['value'])}
+            for position, option in enumerate(options) if 'value' in option]
+    ids = bulk_insert(AnswerOption, rows, 'position')
+    return [(ids[row['position']], json.loads(row['value'])) for row in rows]
+
+
+class AnswerCodec:
+    """Packs quiz answers as arrays of answer_option ids.
+
+    An option id identifies both the question and the chosen option, so a
+    six-question response is a 1-byte width header plus six 2-byte ids
+    instead of a JSON object. Option rows never change, so decoding is a
+    lookup in a per-process map that only ever grows. The current question
+    set used to validate submissions is tagged with the shared questions
+    generation and reloaded when another process has changed the questions.
+    """
+
+    def __init__(self):
+        self._options = {}  # option id -> (question key, value)
+        self._questions = None  # question key -> {option key: option id} for current questions
+        self._generation = None  # questions generation self._questions was read at
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Read every answer option and the current question ids"""
+        generation = shared_cache.generation(QUESTIONS)
+        current = {str(question_id) for question_id, in db.session.query(Question.id)}
+        options = {}
+        questions = {key: {} for key in current}
+        for row in AnswerOption.query.order_by(AnswerOption.question_id, AnswerOption.position):
+            key = str(row.question_id)
+            options[row.id] = (key, json.loads(row.value))
+            if key in questions:
+                questions[key][row.value] = row.id
+        with self._lock:
+            self._options.update(options)
+            self._questions = questions
+            self._generation = generation
+            self._loaded_at = time.monotonic()
+
+    def _advance(self, generation):
+        # The change is the only one since our load: keep the patched set current
+        if generation is not None and self._generation == generation - 1:
+            self._generation = generation
+
+    def add_question(self, question_id, options, generation=None):
+        """Record a committed question's options, as returned by add_question_options.
+
+        generation is the questions generation bumped for this change; if
+        other changes were made in between, the next encode() reloads.
+        """
+        key = str(question_id)
+        with self._lock:
+            for option_id, value in options:
+                self._options[option_id] = (key, value)
+            if self._questions is not None:
+                self._questions = dict(self._questions, **{key: {option_key(value): option_id
+                                                               for option_id, value in options}})
+                self._advance(generation)
+
+    def remove_question(self, question_id, generation=None):
+        """Stop accepting answers to a deleted question; stored answers still decode"""
+        with self._lock:
+            if self._questions is not None:
+                self._questions = {key: options for key, options in self._questions.items()
+                                   if key != str(question_id)}
+                self._advance(generation)
+
+    def invalidate(self):
+        with self._lock:
+            self._questions = None
+
+    def encode(self, answers, strict=True):
+        """Pack an answers dict {question id: option value} into bytes.
+
+        Raises AnswerError for unknown questions or options; with
+        strict=False returns None instead.
+        """
+        questions = self._questions
+        if (questions is None or self._generation != shared_cache.generation(QUESTIONS)
+                or (any(str(key) not in questions for key in answers)
+                    and time.monotonic() - self._loaded_at >= RELOAD_INTERVAL)):
+            # Changed in another process, or an unknown question that may be on another node
+            self.load()
+            questions = self._questions
+
+        option_ids = []
+        errors = {}
+        for key, value in answers.items():
+            options = questions.get(str(key))
+            if options is None:
+                errors[str(key)] = ['Unknown question.']
+                continue
+            option_id = options.get(option_key(value))
+            if option_id is None:
+                errors[str(key)] = ['Not one of the question options.']
+                continue
+            option_ids.append(option_id)
+        if errors:
+            if not strict:
+                return None
+            raise AnswerError(errors)
+
+        width = 2 if max(option_ids, default=0) < 1 << 16 else 4
+        return struct.pack(f'<B{len(option_ids)}{"H" if width == 2 else "I"}', width, *option_ids)
+
+    @staticmethod
+    def option_ids(codes):
+        """The answer_option ids packed in bytes from encode()"""
+        width = codes[0]
+        return struct.unpack(f'<{(len(codes) - 1) // width}{"H" if width == 2 else "I"}', codes[1:])
+
+    def decode(self, codes):
+        """Unpack bytes from encode() back into the submitted answers dict"""
+        answers = {}
+        for option_id in self.option_ids(codes):
+            option = self._options.get(option_id)
+            if option is None:
+                self.load()
+                option = self._options[option_id]
+            answers[option[0]] = option[1]
+        return answers
+
+    def question_options(self):
+        """{question key: [(option id, value)]} for the current questions, in option order"""
+        questions = self._questions
+        if questions is None or self._generation != shared_cache.generation(QUESTIONS):
+            self.load()
+            questions = self._questions
+        return {key: [(option_id, self._options[option_id][1]) for option_id in options.values()]
+                for key, options in questions.items()}
+
+    def answers(self, answer_codes, answers_json):
+        """The answers dict of a quiz_response row, whichever way it is stored"""
+        if answer_codes is not None:
+            return self.decode(answer_codes)
+        return json.loads(answers_json)
+
+    def expand(self, item):
+        """Replace answer_codes in a response dict with the answers JSON string the API returns"""
+        answer_codes = item.pop('answer_codes', None)
+        if answer_codes is not None and 'answers' in item:
+            item['answers'] = json.dumps(self.decode(answer_codes))
+        return item
+
+
+answer_codec = AnswerCodec()
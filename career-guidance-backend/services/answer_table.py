@@ -0,0 +1,124 @@
+import json
+import threading
+import numpy as np
+from models.user import Question
+from services.scoring import TOP_N
+from services.shared_cache import QUESTIONS, shared_cache
+
+
+class AnswerLookupTable:
+    """Precomputed top-N recommendations for every possible quiz answer combination.
+
+    Each combination of option indices is packed into a mixed-radix code
+    (one digit per question). The ranked career indices and scores (stored
+    in tenths) for every code live in two compact uint16 arrays, so serving
+    a recommendation is a dict lookup per answer plus one array read.
+    """
+
+    def __init__(self, engine, questions, top_n=TOP_N):
+        self.engine = engine
+        self.top_n = min(top_n, len(engine.career_names))
+        self.question_keys = [str(question_id) for question_id, _ in questions]
+        self.option_indices = [
+            {value: index for index, value in enumerate(values)}
+            for _, values in questions
+        ]
+        self.radices = [len(values) for _, values in questions]
+        self.size = int(np.prod(self.radices, dtype=np.int64))
+
+        # C-order strides, first question is the most significant digit
+        strides = []
+        stride = 1
+        for radix in reversed(self.radices):
+            strides.append(stride)
+            stride *= radix
+        self.strides = list(reversed(strides))
+
+        # Encoded trait-match rows for each option of each question
+        option_rows = [engine.value_rows(values) for _, values in questions]
+        codes = np.arange(self.size, dtype=np.int64)
+        digits = np.unravel_index(codes, self.radices)
+        encoded = np.zeros((self.size, len(engine.traits)), dtype=np.float64)
+        for rows, digit in zip(option_rows, digits):
+            encoded += rows[digit]
+
+        order, scores = engine.rank(engine.score_matrix(encoded), self.top_n)
+        self.careers = order.astype(np.uint16)
+        self.scores = np.rint(scores * 10).astype(np.uint16)
+
+    def code_for(self, answers):
+        """Return the combination code for an answers dict, or None if it is not in the table"""
+        if len(answers) != len(self.question_keys):
+            return None
+        code = 0
+        for key, options, stride in zip(self.question_keys, self.option_indices, self.strides):
+            value = answers.get(key)
+            if not isinstance(value, str):
+                return None
+            index = options.get(value)
+            if index is None:
+                return None
+            code += index * stride
+        return code
+
+    def lookup(self, answers):
+        """Return precomputed recommendations for answers, or None to fall back to live scoring"""
+        code = self.code_for(answers)
+        if code is None:
+            return None
+        return self.engine.build_recommendations(self.careers[code], self.scores[code] / 10)
+
+
+_table = None
+_table_engine = None
+_table_generation = None
+_table_lock = threading.Lock()
+
+
+def load_question_options():
+    """Return [(question_id, [option values])] for the current question set"""
+    questions = []
+    for question in Question.query.order_by(Question.id).all():
+        options = json.loads(question.options)
+        questions.append((question.id, [option.get('value') for option in options]))
+    return questions
+
+
+def build_answer_table(engine, max_combinations):
+    """Enumerate the answer space into a lookup table, or return None if it is too large"""
+    questions = load_question_options()
+    if not questions:
+        return None
+    size = 1
+    for _, values in questions:
+        # Duplicate or non-string option values cannot be addressed by index
+        if not values or len(set(values)) != len(values) or not all(isinstance(v, str) for v in values):
+            return None
+        size *= len(values)
+        if size > max_combinations:
+            return None
+    return AnswerLookupTable(engine, questions)
+
+
+def get_answer_table(engine, max_combinations):
+    """Return the lookup table for the current questions, building it on first use"""
+    global _table, _table_engine, _table_generation
+    generation = shared_cache.generation(QUESTIONS)
+    table = _table
+    if table is not None and _table_engine is engine and _table_generation == generation:
+        return table
+    with _table_lock:
+        if _table is None or _table_engine is not engine or _table_generation != generation:
+            # False marks an answer space too large to enumerate
+            _table = build_answer_table(engine, max_combinations) or False
+            _table_engine = engine
+            _table_generation = generation
+        return _table
+
+
+def invalidate_answer_table():
+    """Drop the lookup table so it is rebuilt against the new question set"""
+    global _table, _table_engine
+    with _table_lock:
+        _table = None
+        _table_engine = None
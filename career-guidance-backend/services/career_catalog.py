@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+from services.scoring import CareerScoringEngine
+from services.shared_cache import CATALOG, shared_cache
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'careers.json')
+
+
+class CatalogSnapshot:
+    """Immutable, versioned view of the career catalog.
+
+    Holds the compiled scoring engine and the inverted trait -> careers
+    index. A reload builds a new snapshot and swaps it in, so requests that
+    already hold a snapshot keep scoring against a consistent catalog.
+    """
+
+    __slots__ = ('version', 'checksum', 'careers', 'trait_index', 'engine', 'loaded_at')
+
+    def __init__(self, version, checksum, careers):
+        profiles = {}
+        for career in careers:
+            profile = dict(career['weights'])
+            profile['description'] = career.get('description')
+            profile['details'] = career.get('details') or {}
+            profiles[career['name']] = profile
+
+        engine = CareerScoringEngine(profiles)
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'checksum', checksum)
+        object.__setattr__(self, 'careers', tuple(MappingProxyType(career) for career in careers))
+        object.__setattr__(self, 'trait_index', MappingProxyType({
+            trait: tuple(engine.career_names[index] for index in engine.trait_careers[position])
+            for trait, position in engine.trait_index.items()
+        }))
+        object.__setattr__(self, 'engine', engine)
+        object.__setattr__(self, 'loaded_at', time.time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError('CatalogSnapshot is immutable')
+
+    def fingerprint(self, answers):
+        """Canonical hash of an answers dict scored against this catalog version"""
+        canonical = json.dumps(answers, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(f'{self.version}:{self.checksum}:{canonical}'.encode()).hexdigest()
+
+    def to_dict(self):
+        return {
+            'version': self.version,
+            'checksum': self.checksum,
+            'careers': len(self.careers),
+            'traits': len(self.trait_index),
+            'loaded_at': self.loaded_at
+        }
+
+
+def load_catalog(path=DEFAULT_CATALOG_PATH):
+    """Read and validate a catalog file into a CatalogSnapshot"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = json.loads(raw)
+
+    careers = data.get('careers')
+    if not isinstance(careers, list) or not careers:
+        raise ValueError('Career catalog must contain a non-empty "careers" list')
+    names = set()
+    for career in careers:
+        if not career.get('name') or career['name'] in names:
+            raise ValueError(f'Career catalog has a missing or duplicate name: {career.get("name")!r}')
+        names.add(career['name'])
+        weights = career.get('weights')
+        if not isinstance(weights, dict) or not all(isinstance(w, (int, float)) for w in weights.values()):
+            raise ValueError(f'Career {career["name"]!r} must have numeric "weights"')
+
+    return CatalogSnapshot(int(data.get('version', 0)), hashlib.sha256(raw).hexdigest(), careers)
+
+
+class CatalogRegistry:
+    """Process-wide holder of the current catalog snapshot with hot reload.
+
+    The catalog file is read once per process. While serving, the file's
+    mtime is checked at most every `check_interval` seconds and a changed
+    file is reloaded by the request that notices it, without restarting
+    workers. A reload through the admin endpoint also bumps the shared
+    catalog generation, which every other process checks on each get(), so
+    they follow it immediately. A file that fails to parse leaves the
+    previous snapshot in place.
+    """
+
+    def __init__(self, path=None, check_interval=5.0):
+        self.path = path or DEFAULT_CATALOG_PATH
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.path = app.config.get('CAREER_CATALOG_PATH') or self.path
+        self.check_interval = app.config.get('CAREER_CATALOG_CHECK_INTERVAL', self.check_interval)
+        app.extensions['career_catalog'] = self
+
+    def get(self):
+        """Return the current snapshot, reloading it if the catalog file changed"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.reload()
+        if self._generation != shared_cache.generation(CATALOG):
+            try:
+                return self.reload()
+            except (OSError, ValueError):
+                return snapshot
+        if self.check_interval is not None and time.monotonic() - self._checked_at >= self.check_interval:
+            self._checked_at = time.monotonic()
+            try:
+                changed = os.stat(self.path).st_mtime_ns != self._mtime
+            except OSError:
+                changed = False
+            if changed:
+                try:
+                    return self.reload()
+                except (OSError, ValueError):
+                    return snapshot
+        return snapshot
+
+    def reload(self, broadcast=False):
+        """Load the catalog file and swap in a new snapshot.
+
+        With broadcast=True every other process on the node reloads too.
+        """
+        with self._lock:
+            generation = shared_cache.bump(CATALOG) if broadcast else shared_cache.generation(CATALOG)
+            mtime = os.stat(self.path).st_mtime_ns
+            try:
+                snapshot = load_catalog(self.path)
+            finally:
+                # A bad file is not retried on every request until the generation moves again
+                self._generation = generation
+            self._snapshot = snapshot
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+            return snapshot
+
+
+catalog_registry = CatalogRegistry()
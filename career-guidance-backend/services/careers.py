@@ -0,0 +1,103 @@
+import hashlib
+import json
+import threading
+from models.user import Career, db
+from models.bulk import upsert_row
+
+
+def career_values(name, description, details):
+    """Column values for a career row, keyed by a hash of its content"""
+    # Stored in catalog key order; hashed in a canonical order
+    content = json.dumps([name, description, details or {}], sort_keys=True, separators=(',', ':'))
+    return {
+        'name': name,
+        'description': description,
+        'details': json.dumps(details or {}),
+        'content_hash': hashlib.sha256(content.encode()).hexdigest()
+    }
+
+
+class CareerCache:
+    """Per-process cache of career rows by id, with details already parsed.
+
+    Recommendation rows only reference a career id. Career rows never
+    change once written, so entries never go stale and a miss is just a
+    row written by another process. A snapshot's careers are mapped to ids
+    once per catalog version, adding rows for any that are new.
+    """
+
+    def __init__(self):
+        self._by_id = {}
+        self._by_hash = {}
+        self._snapshot = None
+        self._snapshot_ids = None
+        self._lock = threading.Lock()
+
+    def _add(self, career_id, name, description, details, content_hash):
+        with self._lock:
+            self._by_id[career_id] = {
+                'name': name,
+                'description': description,
+                'details': json.loads(details) if details else {}
+            }
+            self._by_hash[content_hash] = career_id
+
+    def load(self):
+        """Read every career row into memory"""
+        for row in Career.query.all():
+            self._add(row.id, row.name, row.description, row.details, row.content_hash)
+
+    def get(self, career_id):
+        """Return {'name', 'description', 'details'} for a career id"""
+        entry = self._by_id.get(career_id)
+        if entry is None:
+            row = db.session.get(Career, career_id)
+            if row is None:
+                raise LookupError(f'Unknown career id {career_id}')
+            self._add(row.id, row.name, row.description, row.details, row.content_hash)
+            entry = self._by_id[career_id]
+        return entry
+
+    def expand(self, item):
+        """Replace career_id in a recommendation dict with the career's name, description and details"""
+        career_id = item.pop('career_id', None)
+        if career_id is None:
+            return item
+        career = self.get(career_id)
+        item['career'] = career['name']
+        item['description'] = career['description']
+        item['details'] = career['details']
+        return item
+
+    def ids_for(self, snapshot):
+        """Map each career name in a catalog snapshot to its row id, adding rows for new careers.
+
+        New rows are only flushed; the caller's commit persists them. Until
+        then they are left out of the cache, so a rolled back transaction
+        cannot leave ids behind that no row has.
+        """
+        if self._snapshot is snapshot:
+            return self._snapshot_ids
+
+        values = [career_values(career['name'], career.get('description'), career.get('details'))
+                  for career in snapshot.careers]
+        created = {}
+        missing = [value['content_hash'] for value in values if value['content_hash'] not in self._by_hash]
+        if missing:
+            for row in Career.query.filter(Career.content_hash.in_(missing)).all():
+                self._add(row.id, row.name, row.description, row.details, row.content_hash)
+            new = [value for value in values if value['content_hash'] not in self._by_hash]
+            if new:
+                # Another process may insert the same career first; the upsert returns its id
+                created = {value['content_hash']: upsert_row(Career, value, ['content_hash']) for value in new}
+                db.session.flush()
+
+        ids = {value['name']: created.get(value['content_hash']) or self._by_hash[value['content_hash']]
+               for value in values}
+        if not created:
+            with self._lock:
+                self._snapshot, self._snapshot_ids = snapshot, ids
+        return ids
+
+
+career_cache = CareerCache()
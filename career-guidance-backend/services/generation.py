@@ -0,0 +1,165 @@
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import func, insert, select
+from models.user import CareerRecommendation, QuizResponse, db
+from models.bulk import bulk_insert
+from services.career_catalog import catalog_registry
+from services.careers import career_cache
+from services.recommendation_cache import recommendation_cache
+from services.answer_codec import answer_codec
+from services.answer_table import get_answer_table
+from services.analytics import apply_counts, count_recommendations, delete_recommendations
+
+
+def generate_career_recommendations(answers, snapshot=None):
+    """Enhanced career recommendation algorithm with expanded career database"""
+    engine = (snapshot or catalog_registry.get()).engine
+    if current_app.config.get('RECOMMENDATION_LOOKUP_TABLE'):
+        table = get_answer_table(engine, current_app.config['RECOMMENDATION_LOOKUP_MAX_COMBINATIONS'])
+        if table:
+            recommendations = table.lookup(answers)
+            if recommendations is not None:
+                return recommendations
+    return engine.recommend(answers)
+
+
+def generate_for_user(user_id):
+    """Score a user's latest quiz response and store the result.
+
+    Returns (body, status) exactly as POST /recommendations/generate
+    answers them: 400 without a quiz response, 200 when the stored
+    recommendations already match the answers and catalog, else 201 after
+    replacing them. The caller owns error handling and rollback.
+    """
+    # Get user's latest quiz response
+    response = QuizResponse.query.filter_by(user_id=user_id).order_by(QuizResponse.timestamp.desc()).first()
+
+    if not response:
+        return {'error': 'No quiz response found. Please take the quiz first.'}, 400
+
+    answers = answer_codec.answers(response.answer_codes, response.answers)
+    snapshot = catalog_registry.get()
+    fingerprint = snapshot.fingerprint(answers)
+
+    # Same answers scored against the same catalog: nothing to write
+    existing = CareerRecommendation.query.filter_by(user_id=user_id).order_by(
+        CareerRecommendation.score.desc(), CareerRecommendation.id).all()
+    if existing and all(rec.answers_fingerprint == fingerprint for rec in existing):
+        return {
+            'message': 'Recommendations are up to date',
+            'recommendations': [career_cache.expand(rec.to_dict()) for rec in existing]
+        }, 200
+
+    # Generate recommendations using enhanced algorithm
+    recommendations_data = generate_career_recommendations(answers, snapshot)
+
+    # Replace existing recommendations in one transaction: a delete
+    # (returning the replaced rows for the analytics counts) and a single
+    # multi-row insert, returning the payload we built
+    career_ids = career_cache.ids_for(snapshot)
+    created_at = datetime.utcnow()
+    rows = [{
+        'user_id': user_id,
+        'career_id': career_ids[rec_data['career']],
+        'score': rec_data['score'],
+        'answers_fingerprint': fingerprint,
+        'created_at': created_at
+    } for rec_data in recommendations_data]
+
+    previous = delete_recommendations([user_id]).get(user_id)
+    ids = bulk_insert(CareerRecommendation, rows, 'career_id')
+    counts = Counter()
+    count_recommendations(counts, previous, -1)
+    count_recommendations(counts, [(row['career_id'], created_at) for row in rows])
+    apply_counts(counts)
+    db.session.commit()
+    recommendation_cache.invalidate(user_id)
+
+    final_recommendations = []
+    for rec_data in recommendations_data:
+        final_recommendations.append({
+            'id': ids[career_ids[rec_data['career']]],
+            'user_id': user_id,
+            'career': rec_data['career'],
+            'score': rec_data['score'],
+            'description': rec_data['description'],
+            'details': rec_data['details'],
+            'created_at': created_at.isoformat()
+        })
+
+    return {
+        'message': 'Recommendations generated successfully',
+        'recommendations': final_recommendations
+    }, 201
+
+
+def stale_response_chunks(snapshot, chunk_size=1000, force=False):
+    """Yield (scanned, [(user_id, answers, fingerprint)]) for each chunk of quiz responses.
+
+    Walks quiz_response by id so memory stays flat, and leaves out users
+    whose stored recommendations were already scored from the same answers
+    against this catalog version (unless force), which makes an
+    interrupted regeneration resumable by simply running it again.
+    """
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(QuizResponse.id, QuizResponse.user_id, QuizResponse.answer_codes, QuizResponse.answers)
+            .where(QuizResponse.id > last_id).order_by(QuizResponse.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+
+        current = {}
+        if not force:
+            fingerprint = CareerRecommendation.answers_fingerprint
+            current = {
+                user_id: low for user_id, low, high, complete in db.session.execute(
+                    select(CareerRecommendation.user_id, func.min(fingerprint), func.max(fingerprint),
+                           func.count(fingerprint) == func.count())
+                    .where(CareerRecommendation.user_id.in_([row.user_id for row in rows]))
+                    .group_by(CareerRecommendation.user_id)
+                )
+                if low == high and complete
+            }
+
+        stale = []
+        for row in rows:
+            answers = answer_codec.answers(row.answer_codes, row.answers)
+            fingerprint = snapshot.fingerprint(answers)
+            if current.get(row.user_id) != fingerprint:
+                stale.append((row.user_id, answers, fingerprint))
+        yield len(rows), stale
+
+
+def replace_recommendations(scored, career_ids, created_at=None):
+    """Replace the stored recommendations of many users in one transaction.
+
+    scored is [(user_id, fingerprint, recommendations)] and career_ids maps
+    career names to rows (CareerCache.ids_for): one delete for all the
+    users, returning the rows it removed for the analytics counts, then
+    one batched insert for all their rows and one write of the counts.
+    """
+    created_at = created_at or datetime.utcnow()
+    rows = [{
+        'user_id': user_id,
+        'career_id': career_ids[rec_data['career']],
+        'score': rec_data['score'],
+        'answers_fingerprint': fingerprint,
+        'created_at': created_at
+    } for user_id, fingerprint, recommendations in scored for rec_data in recommendations]
+
+    counts = Counter()
+    for previous in delete_recommendations([user_id for user_id, _, _ in scored]).values():
+        count_recommendations(counts, previous, -1)
+    for user_id, _, recommendations in scored:
+        count_recommendations(counts, [(career_ids[rec_data['career']], created_at) for rec_data in recommendations])
+    if rows:
+        db.session.execute(insert(CareerRecommendation), rows)
+    apply_counts(counts)
+    db.session.commit()
+    for user_id, _, _ in scored:
+        recommendation_cache.invalidate(user_id)
+    return len(rows)
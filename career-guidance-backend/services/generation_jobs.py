@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from models.user import GenerationJob, db
+from services.generation import generate_for_user
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class GenerationJobs:
+    """Recommendation generation as background jobs polled by id.
+
+    Jobs live in the generation_job table, so any server worker can answer
+    a status request and a user's repeated requests coalesce into the one
+    queued or running job (enforced by a partial unique index across
+    processes). A job scores the user's latest quiz response when it
+    starts. Accepted jobs run on a per-process thread pool; with
+    `workers=0` requests only enqueue and `flask jobs work` consumes the
+    queue in a separate process. Jobs that stay active longer than
+    `timeout` (e.g. their worker died) are failed so the user can retry.
+    """
+
+    def __init__(self, enabled=False, workers=2, timeout=300, retention=3600):
+        self.enabled = enabled
+        self.workers = workers
+        self.timeout = timeout
+        self.retention = retention
+        self.app = None
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RECOMMENDATION_JOBS_ENABLED', self.enabled)
+        self.workers = app.config.get('RECOMMENDATION_JOB_WORKERS', self.workers)
+        self.timeout = app.config.get('RECOMMENDATION_JOB_TIMEOUT', self.timeout)
+        self.retention = app.config.get('RECOMMENDATION_JOB_RETENTION', self.retention)
+        self.app = app
+        self.shutdown()
+        app.extensions['generation_jobs'] = self
+
+    def _get_executor(self):
+        # Threads do not survive fork, so each server worker process builds its own
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='generation-job')
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _is_stale(self, job):
+        return job.created_at < datetime.utcnow() - timedelta(seconds=self.timeout)
+
+    def submit(self, user_id, attempts=3):
+        """Queue a job for the user, or join their active one. Returns (job dict, created)."""
+        for _ in range(attempts):
+            active = GenerationJob.query.filter(
+                GenerationJob.user_id == user_id, GenerationJob.status.in_(ACTIVE_STATUSES)
+            ).first()
+            if active is not None and not self._is_stale(active):
+                return active.to_dict(), False
+            if active is not None:
+                # Committed on its own so a lost insert race below cannot roll it back
+                GenerationJob.query.filter(
+                    GenerationJob.id == active.id, GenerationJob.status.in_(ACTIVE_STATUSES)
+                ).update({'status': 'failed', 'error': 'Job timed out', 'finished_at': datetime.utcnow()},
+                         synchronize_session=False)
+                db.session.commit()
+
+            job = GenerationJob(id=uuid.uuid4().hex, user_id=user_id, status='queued', created_at=datetime.utcnow())
+            db.session.add(job)
+            try:
+                db.session.flush()
+            except IntegrityError:
+                # Another worker queued one between our check and insert: join it,
+                # or try again if it already finished
+                db.session.rollback()
+                continue
+            job_data = job.to_dict()
+            db.session.commit()
+
+            if self.workers:
+                self._get_executor().submit(self._run_in_app_context, job_data['id'])
+            return job_data, True
+        raise RuntimeError('Could not queue a recommendation job, please retry')
+
+    def get(self, job_id):
+        return db.session.get(GenerationJob, job_id)
+
+    def run(self, job_id):
+        """Claim a queued job and run it to completion. Returns False if it was not queued."""
+        job = db.session.get(GenerationJob, job_id)
+        if job is None or job.status != 'queued':
+            return False
+        user_id = job.user_id
+        claimed = GenerationJob.query.filter_by(id=job_id, status='queued').update(
+            {'status': 'running', 'started_at': datetime.utcnow()}
+        )
+        db.session.commit()
+        if not claimed:
+            return False
+
+        try:
+            body, status = generate_for_user(user_id)
+        except Exception as e:
+            db.session.rollback()
+            logger.exception('Recommendation job %s failed', job_id)
+            body, status = {'error': str(e)}, 500
+        GenerationJob.query.filter_by(id=job_id).update({
+            'status': 'done' if status < 400 else 'failed',
+            'result': json.dumps(body),
+            'result_status': status,
+            'error': body.get('error'),
+            'finished_at': datetime.utcnow()
+        })
+        db.session.commit()
+        return True
+
+    def run_next(self):
+        """Run the oldest queued job, if any. Returns whether one ran."""
+        job_ids = db.session.execute(
+            db.select(GenerationJob.id).filter_by(status='queued').order_by(GenerationJob.created_at).limit(5)
+        ).scalars().all()
+        # Another consumer may claim the oldest first; try the next ones
+        return any(self.run(job_id) for job_id in job_ids)
+
+    def prune(self):
+        """Fail jobs stuck past the timeout and delete finished ones past retention"""
+        now = datetime.utcnow()
+        failed = GenerationJob.query.filter(
+            GenerationJob.status.in_(ACTIVE_STATUSES),
+            GenerationJob.created_at < now - timedelta(seconds=self.timeout)
+        ).update({'status': 'failed', 'error': 'Job timed out', 'finished_at': now}, synchronize_session=False)
+        deleted = GenerationJob.query.filter(
+            GenerationJob.status.notin_(ACTIVE_STATUSES),
+            GenerationJob.finished_at < now - timedelta(seconds=self.retention)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return failed, deleted
+
+    def _run_in_app_context(self, job_id):
+        try:
+            with self.app.app_context():
+                self.run(job_id)
+                self.prune()
+        except Exception:
+            logger.exception('Recommendation job %s could not be run', job_id)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._executor_pid = None
+
+
+generation_jobs = GenerationJobs()
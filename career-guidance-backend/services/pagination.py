@@ -0,0 +1,141 @@
+import base64
+import json
+from datetime import datetime
+from urllib.parse import urlencode
+from flask import jsonify, request
+from sqlalchemy import select, tuple_
+from models.user import db
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class PaginationError(ValueError):
+    """Raised for malformed limit, cursor or fields query parameters"""
+
+
+def encode_cursor(values):
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise PaginationError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise PaginationError('Invalid cursor')
+    decoded = []
+    for column, value in zip(columns, values):
+        if value is not None and column.type.python_type is datetime:
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise PaginationError('Invalid cursor')
+        decoded.append(value)
+    return decoded
+
+
+def parse_page_args(allowed_fields):
+    """Read limit, cursor and fields from the query string"""
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise PaginationError('limit must be an integer')
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise PaginationError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+
+    fields = allowed_fields
+    if request.args.get('fields'):
+        fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+        unknown = [field for field in fields if field not in allowed_fields]
+        if unknown:
+            raise PaginationError(f'Unknown fields: {", ".join(unknown)}')
+    return limit, request.args.get('cursor'), fields
+
+
+def keyset_query(model, fields, order_by, limit, cursor_values=None, descending=False):
+    """Build the select for one page after cursor_values along the unique key order_by"""
+    table = model.__table__
+    key_columns = [table.c[name] for name in order_by]
+    selected = [table.c[name] for name in fields]
+    selected += [column for column in key_columns if column.name not in fields]
+
+    stmt = select(*selected)
+    if cursor_values is not None:
+        key = tuple_(*key_columns)
+        values = tuple_(*cursor_values)
+        stmt = stmt.where(key < values if descending else key > values)
+    stmt = stmt.order_by(*[column.desc() if descending else column.asc() for column in key_columns])
+    return stmt.limit(limit)
+
+
+def keyset_page(model, fields, order_by, limit, cursor=None, descending=False):
+    """Fetch one page of plain column rows ordered by the unique key order_by.
+
+    Selects only the requested columns (plus the key columns) through Core,
+    so no ORM objects or identity-map entries are created. Returns
+    (rows as dicts, next cursor or None).
+    """
+    cursor_values = None
+    if cursor:
+        table = model.__table__
+        cursor_values = decode_cursor(cursor, [table.c[name] for name in order_by])
+    stmt = keyset_query(model, fields, order_by, limit + 1, cursor_values, descending)
+    rows = db.session.execute(stmt).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][name] for name in order_by])
+    return [dict(row) for row in rows], next_cursor
+
+
+def serialize_row(row, fields):
+    data = {}
+    for field in fields:
+        value = row[field]
+        data[field] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+
+
+def source_columns(fields, computed=None):
+    """Columns to select for fields, where computed maps derived fields to the column(s) they are built from"""
+    computed = computed or {}
+    columns = []
+    for field in fields:
+        source = computed.get(field, field)
+        columns.extend([source] if isinstance(source, str) else source)
+    return list(dict.fromkeys(columns))
+
+
+def paginated_response(model, allowed_fields, order_by, descending=False, transform=None, computed=None):
+    """Build a keyset-paginated JSON list response for an admin list endpoint.
+
+    The body stays a JSON array of the requested fields; the cursor for the
+    next page is returned in the X-Next-Cursor header and a Link header.
+    Fields in computed are not columns: their source column is selected
+    instead and transform must fill them in.
+    """
+    limit, cursor, fields = parse_page_args(allowed_fields)
+    columns = source_columns(fields, computed)
+    rows, next_cursor = keyset_page(model, columns, order_by, limit, cursor, descending)
+    items = []
+    for row in rows:
+        item = serialize_row(row, columns)
+        if transform:
+            item = transform(item)
+        if computed:
+            item = {field: item[field] for field in fields}
+        items.append(item)
+
+    response = jsonify(items)
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        args['limit'] = str(limit)
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_HASH_METHOD = 'scrypt:32768:8:1'
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503"""
+
+    retry_after = 1
+
+
+class PasswordHasher:
+    """Runs password hashing in a process pool behind a bounded queue.
+
+    scrypt is deliberately CPU-heavy, so hashing inline pins request
+    workers during login bursts. Jobs run in a separate process pool for
+    real parallelism; at most `queue_size` jobs may be pending, after which
+    callers get PasswordHasherBusy instead of queueing without bound.
+    With `workers=0` hashing runs inline (useful for the CLI and local dev).
+    """
+
+    def __init__(self, method=DEFAULT_HASH_METHOD, workers=0, queue_size=None, timeout=30):
+        self.method = method
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._method_prefix = None
+        self._executor = None
+        self._executor_pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', self.method)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.queue_size = app.config.get('PASSWORD_HASH_QUEUE_SIZE', self.queue_size)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        self._method_prefix = None
+        self.shutdown()
+        app.extensions['password_hasher'] = self
+
+    def _get_executor(self):
+        # Pools do not survive fork, so each server worker process builds its own
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    # Never fork a threaded server worker: children come from a
+                    # single-threaded fork server (or are spawned on Windows) and
+                    # only import werkzeug's hash functions, not the app
+                    if 'forkserver' in multiprocessing.get_all_start_methods():
+                        context = multiprocessing.get_context('forkserver')
+                        context.set_forkserver_preload(['werkzeug.security'])
+                    else:
+                        context = multiprocessing.get_context('spawn')
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                    self._executor_pid = os.getpid()
+                    self._slots = threading.BoundedSemaphore(self.queue_size or self.workers * 4)
+        return self._executor
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        executor = self._get_executor()
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Too many password operations in progress')
+        try:
+            future = executor.submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is held until the job finishes, not just while we wait for it
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordHasherBusy('Password operation timed out')
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def method_prefix(self):
+        """The configured method as werkzeug writes it into hashes.
+
+        Shorthand methods get their defaults filled in ('scrypt' is stored
+        as 'scrypt:32768:8:1', 'pbkdf2:sha256' with its iteration count), so
+        the prefix is taken from one probe hash rather than from the config.
+        """
+        if self._method_prefix is None:
+            self._method_prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return self._method_prefix
+
+    def needs_rehash(self, password_hash):
+        """True if the hash was made with a different method or cost than configured"""
+        return password_hash.split('$', 1)[0] != self.method_prefix()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._executor_pid = None
+
+
+password_hasher = PasswordHasher()
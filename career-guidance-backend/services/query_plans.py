@@ -0,0 +1,105 @@
+import re
+from datetime import datetime
+from sqlalchemy import delete, select
+from models.user import CareerRecommendation, Feedback, GenerationJob, Question, QuizResponse, User, db
+from services.analytics import RECOMMENDED_USERS, RESPONSES, counter_query
+from services.export import export_query
+from services.pagination import keyset_query
+
+SCAN = re.compile(r'^SCAN (\S+)')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+def route_queries():
+    """Return (route, statement, ordered_listing) for the queries issued by each route.
+
+    Statements come from the same builders the routes use (or mirror the
+    route's ORM query exactly) with placeholder parameter values.
+    ordered_listing marks LIMITed listings that may walk a whole index in
+    order; every other query must SEARCH.
+    """
+    day = datetime(2026, 1, 1)
+    return [
+        ('auth.register, auth.login: user by email',
+         select(User).where(User.email == 'student@example.com'), False),
+        ('auth.get_current_user, user.get_user: user by id',
+         select(User).where(User.id == 1), False),
+        ('quiz.get_user_responses',
+         select(QuizResponse).where(QuizResponse.user_id == 1), False),
+        ('quiz.delete_question',
+         select(Question).where(Question.id == 1), False),
+        ('recommendations.generate_recommendations: latest response',
+         select(QuizResponse).where(QuizResponse.user_id == 1)
+         .order_by(QuizResponse.timestamp.desc()).limit(1), False),
+        ('recommendations.get_user_recommendations',
+         select(CareerRecommendation).where(CareerRecommendation.user_id == 1)
+         .order_by(CareerRecommendation.score.desc()), False),
+        ('recommendations.generate_recommendations: stored rows',
+         select(CareerRecommendation).where(CareerRecommendation.user_id == 1)
+         .order_by(CareerRecommendation.score.desc(), CareerRecommendation.id), False),
+        ('recommendations.generate_recommendations, user.delete_user: replace rows',
+         delete(CareerRecommendation).where(CareerRecommendation.user_id.in_([1]))
+         .returning(CareerRecommendation.user_id, CareerRecommendation.career_id), False),
+        ('quiz.submit_quiz_response, user.delete_user: replace response',
+         delete(QuizResponse).where(QuizResponse.user_id == 1).returning(QuizResponse.id), False),
+        ('flask analytics rebuild: recommendations best first',
+         select(CareerRecommendation.user_id, CareerRecommendation.career_id, CareerRecommendation.created_at)
+         .order_by(CareerRecommendation.user_id, CareerRecommendation.score.desc(), CareerRecommendation.id), True),
+        ('recommendations.generate_recommendations: active job',
+         select(GenerationJob).where(GenerationJob.user_id == 1, GenerationJob.status.in_(('queued', 'running'))), False),
+        ('flask jobs work: oldest queued jobs',
+         select(GenerationJob.id).where(GenerationJob.status == 'queued').order_by(GenerationJob.created_at).limit(5), False),
+        ('feedback.get_user_feedback',
+         select(Feedback).where(Feedback.user_id == 1).order_by(Feedback.date.desc()), False),
+        ('user.get_users: next page',
+         keyset_query(User, ['id', 'name', 'email'], ['id'], 100, [1]), False),
+        ('feedback.get_all_feedback: first page',
+         keyset_query(Feedback, ['id', 'user_id', 'message', 'date'], ['date', 'id'], 100, descending=True), True),
+        ('feedback.get_all_feedback: next page',
+         keyset_query(Feedback, ['id', 'user_id', 'message', 'date'], ['date', 'id'], 100, [day, 1], descending=True), False),
+        ('quiz.get_all_responses: next page',
+         keyset_query(QuizResponse, ['id', 'user_id', 'timestamp', 'answers'], ['id'], 100, [1]), False),
+        ('recommendations.get_all_recommendations: next page',
+         keyset_query(CareerRecommendation, ['id', 'career_id', 'score'], ['id'], 100, [1]), False),
+        ('analytics.get_analytics: running totals',
+         counter_query(), False),
+        ('analytics.get_analytics: day range',
+         counter_query(since=day.date(), until=day.date()), False),
+        ('analytics.get_analytics: daily series',
+         counter_query([RESPONSES, RECOMMENDED_USERS], day.date(), day.date()), False),
+        ('quiz.export_responses: date range',
+         export_query(QuizResponse, ['id', 'user_id', 'timestamp', 'answers'], 'timestamp', day, day), False),
+        ('recommendations.export_recommendations: date range',
+         export_query(CareerRecommendation, ['id', 'career_id', 'score'], 'created_at', day, day), False),
+    ]
+
+
+def explain(statement):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement (SQLite only)"""
+    connection = db.session.connection()
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', parameters).all()
+    return [row[-1] for row in rows]
+
+
+def plan_problems(plan, ordered_listing=False):
+    """Return the plan lines that indicate a table scan or an in-memory sort"""
+    problems = []
+    for line in plan:
+        if TEMP_SORT in line:
+            problems.append(line)
+        elif SCAN.match(line) and not (ordered_listing and 'USING' in line):
+            problems.append(line)
+    return problems
+
+
+def check_query_plans():
+    """Explain every route query, returning [(route, plan, problems)]"""
+    if db.session.get_bind().dialect.name != 'sqlite':
+        raise RuntimeError('Query plan checks require a SQLite database')
+    results = []
+    for route, statement, ordered_listing in route_queries():
+        plan = explain(statement)
+        results.append((route, plan, plan_problems(plan, ordered_listing)))
+    return results
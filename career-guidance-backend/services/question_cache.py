@@ -0,0 +1,54 @@
+import hashlib
+import json
+import threading
+from flask import current_app
+from models.user import Question
+from services.shared_cache import QUESTIONS, shared_cache
+
+
+class QuestionCache:
+    """Pre-serialized GET /api/quiz/questions body with a strong content ETag.
+
+    Questions only change through the admin create/delete endpoints, which
+    call invalidate() after committing. That bumps the shared questions
+    generation, so every worker on the node drops its copy at once; the
+    first one to notice rebuilds the body and stores it in the shared
+    cache for the others.
+    """
+
+    def __init__(self):
+        self._entry = None  # (generation, body, etag)
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return (body bytes, etag) for the current question set"""
+        generation = shared_cache.generation(QUESTIONS)
+        entry = self._entry
+        if entry is None or entry[0] != generation:
+            with self._lock:
+                entry = self._entry
+                if entry is None or entry[0] != generation:
+                    body = shared_cache.get(QUESTIONS, generation)
+                    if body is None:
+                        body = self._build()
+                        shared_cache.put(QUESTIONS, generation, body)
+                    entry = self._entry = (generation, body, hashlib.sha256(body).hexdigest())
+        return entry[1], entry[2]
+
+    def invalidate(self):
+        """Drop the question body in every process; return the new questions generation"""
+        with self._lock:
+            self._entry = None
+        return shared_cache.bump(QUESTIONS)
+
+    def _build(self):
+        questions_data = []
+        for question in Question.query.order_by(Question.id).all():
+            question_dict = question.to_dict()
+            # Parse options JSON string back to list
+            question_dict['options'] = json.loads(question_dict['options'])
+            questions_data.append(question_dict)
+        return current_app.json.dumps(questions_data).encode('utf-8')
+
+
+question_cache = QuestionCache()
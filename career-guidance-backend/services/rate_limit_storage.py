@@ -0,0 +1,208 @@
+import os
+import sqlite3
+import struct
+import threading
+import time
+import urllib.parse
+from math import floor
+from limits.storage.base import MovingWindowSupport, SlidingWindowCounterSupport, Storage, TimestampedSlidingWindow
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS counter ('
+    'key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID',
+    # Newest first, at most `limit` timestamps: older entries can never decide a moving window
+    'CREATE TABLE IF NOT EXISTS window ('
+    'key TEXT PRIMARY KEY, events BLOB NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID',
+)
+
+
+class SharedRateLimitStorage(Storage, MovingWindowSupport, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """Flask-Limiter storage shared by every worker process on a node.
+
+    Counters and moving windows live in a local SQLite file, so a client
+    gets the configured limit once per node rather than once per worker.
+    Fixed and sliding window counters are single upsert statements; a
+    moving window keeps at most `limit` packed timestamps per key in one
+    row. Expired rows are swept every `sweep_interval` seconds, and past
+    `max_keys` rows per table the ones closest to expiry are dropped
+    (those clients briefly get a fresh window) so the file stays bounded.
+
+        shared:///path/to/rate_limits.db?sweep_interval=30&max_keys=100000
+    """
+
+    STORAGE_SCHEME = ['shared']
+
+    def __init__(self, uri=None, wrap_exceptions=False, sweep_interval=30.0, max_keys=100000, **options):
+        parsed = urllib.parse.urlparse(uri or 'shared://')
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        self.path = parsed.path or options.get('path') or 'rate_limits.db'
+        self.sweep_interval = float(query.get('sweep_interval', sweep_interval))
+        self.max_keys = int(query.get('max_keys', max_keys))
+        self._local = threading.local()
+        self._swept_at = 0.0
+        self._sweep_lock = threading.Lock()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        pid = os.getpid()
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != pid:
+            # Never reuse a connection opened before a fork
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            # Losing the last instants of counters on a power cut is acceptable
+            connection.execute('PRAGMA synchronous=OFF')
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            self._local.connection, self._local.pid = connection, pid
+        return connection
+
+    def _maybe_sweep(self, now):
+        if now - self._swept_at < self.sweep_interval or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._swept_at = now
+            self.sweep(now)
+        finally:
+            self._sweep_lock.release()
+
+    def sweep(self, now=None):
+        """Delete expired rows and trim each table to max_keys; return the rows removed"""
+        now = now or time.time()
+        connection = self._connection()
+        removed = 0
+        for table in ('counter', 'window'):
+            removed += connection.execute(f'DELETE FROM {table} WHERE expires_at <= ?', (now,)).rowcount
+            excess = connection.execute(f'SELECT count(*) FROM {table}').fetchone()[0] - self.max_keys
+            if excess > 0:
+                removed += connection.execute(
+                    f'DELETE FROM {table} WHERE key IN (SELECT key FROM {table} ORDER BY expires_at LIMIT ?)',
+                    (excess,)
+                ).rowcount
+        return removed
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        self._maybe_sweep(now)
+        return self._connection().execute(
+            'INSERT INTO counter (key, value, expires_at) VALUES (?1, ?2, ?3) '
+            'ON CONFLICT (key) DO UPDATE SET '
+            'value = CASE WHEN expires_at <= ?4 THEN excluded.value ELSE value + excluded.value END, '
+            'expires_at = CASE WHEN expires_at <= ?4 THEN excluded.expires_at ELSE expires_at END '
+            'RETURNING value',
+            (key, amount, now + expiry, now)
+        ).fetchone()[0]
+
+    def decr(self, key, amount=1):
+        row = self._connection().execute(
+            'UPDATE counter SET value = max(value - ?, 0) WHERE key = ? AND expires_at > ? RETURNING value',
+            (amount, key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM counter WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        now = time.time()
+        row = self._connection().execute(
+            'SELECT expires_at FROM counter WHERE key = ? AND expires_at > ?', (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def check(self):
+        try:
+            self._connection().execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        connection = self._connection()
+        return sum(connection.execute(f'DELETE FROM {table}').rowcount for table in ('counter', 'window'))
+
+    def clear(self, key):
+        connection = self._connection()
+        connection.execute('DELETE FROM counter WHERE key = ?', (key,))
+        connection.execute('DELETE FROM window WHERE key = ?', (key,))
+
+    def _events(self, connection, key):
+        row = connection.execute('SELECT events FROM window WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return ()
+        return struct.unpack(f'<{len(row[0]) // 8}d', row[0])
+
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        self._maybe_sweep(now)
+        connection = self._connection()
+        # Read and write the window under one write lock across processes
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            events = self._events(connection, key)
+            if len(events) > limit - amount and events[limit - amount] >= now - expiry:
+                connection.execute('COMMIT')
+                return False
+            events = ((now,) * amount + events)[:limit]
+            connection.execute(
+                'INSERT INTO window (key, events, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET events = excluded.events, expires_at = excluded.expires_at',
+                (key, struct.pack(f'<{len(events)}d', *events), now + expiry)
+            )
+            connection.execute('COMMIT')
+            return True
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        events = [at for at in self._events(self._connection(), key) if at >= now - expiry]
+        if events:
+            return events[-1], len(events)
+        return now, 0
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count, previous_ttl, current_count, _ = self._sliding_window(previous_key, current_key, expiry, now)
+        if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+            return False
+        # The current window's counter lives for two windows: it is the previous one next
+        current_count = self.incr(current_key, 2 * expiry, amount=amount)
+        if floor(previous_count * previous_ttl / expiry + current_count) > limit:
+            # Another worker's hit won the race: give ours back
+            self.decr(current_key, amount)
+            return False
+        return True
+
+    def _sliding_window(self, previous_key, current_key, expiry, now):
+        previous_count = self.get(previous_key)
+        current_count = self.get(current_key)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def get_sliding_window(self, key, expiry):
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        return self._sliding_window(previous_key, current_key, expiry, now)
+
+    def clear_sliding_window(self, key, expiry):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
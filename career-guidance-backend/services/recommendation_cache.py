@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+from services.shared_cache import RECOMMENDATIONS, shared_cache
+
+
+class RecommendationCache:
+    """Bounded per-process LRU of serialized GET /api/recommendations bodies.
+
+    Entries expire after `ttl` seconds and the least recently used entry is
+    evicted past `max_entries`. Each entry records the user's shared
+    generation read before the query it was built from; writers call
+    invalidate(user_id) after committing, which bumps that generation for
+    every process on the node, so no worker serves the old body again and
+    a read that raced the write is never served. `max_entries=0` disables
+    caching.
+    """
+
+    def __init__(self, max_entries=10000, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user_id -> (stored at, version, body)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('RECOMMENDATION_CACHE_SIZE', self.max_entries)
+        self.ttl = app.config.get('RECOMMENDATION_CACHE_TTL', self.ttl)
+        self.clear()
+        app.extensions['recommendation_cache'] = self
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def version(self, user_id):
+        """The user's cache version; read it before querying and pass it to put()"""
+        # The unkeyed generation lets SharedCache.clear() drop every user at once
+        return shared_cache.generation(RECOMMENDATIONS), shared_cache.generation(RECOMMENDATIONS, user_id)
+
+    def get(self, user_id):
+        """Return the cached body for a user, or None"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.monotonic() - entry[0] >= self.ttl:
+                del self._entries[user_id]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            if entry[1] != self.version(user_id):
+                # Invalidated, possibly by another process
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, user_id, body, version):
+        """Cache a body built from a read that began at version (see version())"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic(), version, body)
+            self._entries.move_to_end(user_id)
+            self._evict()
+
+    def invalidate(self, user_id):
+        """Drop a user's body in every process after a committed write"""
+        if not self.enabled:
+            return
+        shared_cache.bump(RECOMMENDATIONS, user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self.invalidations += 1
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+    def metrics_lines(self):
+        """Prometheus exposition lines for RequestMetrics.register_collector"""
+        stats = self.stats()
+        lines = ['# HELP recommendation_cache_entries Cached recommendation bodies in this process.',
+                 '# TYPE recommendation_cache_entries gauge',
+                 f'recommendation_cache_entries {stats["entries"]}',
+                 '# HELP recommendation_cache_events_total Recommendation cache lookups and removals by outcome in this process.',
+                 '# TYPE recommendation_cache_events_total counter']
+        for event in ('hits', 'misses', 'evictions', 'expirations', 'invalidations'):
+            lines.append(f'recommendation_cache_events_total{{event="{event}"}} {stats[event]}')
+        return lines
+
+
+recommendation_cache = RecommendationCache()
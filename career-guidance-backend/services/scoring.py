@@ -0,0 +1,253 @@
+import threading
+import numpy as np
+
+# Keys in a career profile that are not scoring traits
+PROFILE_META_KEYS = ('description', 'details')
+
+# Multiplier applied to a career's raw score, keyed by minimum match count
+SYNERGY_BONUSES = ((3, 1.2), (2, 1.1))
+
+MIN_SCORE = 30
+DEFAULT_SCORE = 50
+TOP_N = 8
+
+# Distinct answer values whose trait-match rows are cached per engine
+MAX_CACHED_VALUES = 4096
+
+# Catalog size from which score_indexed beats dense scoring for one user;
+# below it the index lookups cost more than the columns they skip
+INDEXED_MIN_CAREERS = 200
+
+
+class CareerScoringEngine:
+    """Scores quiz answers against a career catalog with dense NumPy matrices.
+
+    The catalog is compiled once into a career x trait weight matrix and a
+    matching presence mask. Answer sets are encoded into trait-match vectors
+    (1 per exact match, 0.5 per substring match) so a whole batch is scored
+    with two matrix products and gives the same results as the original
+    per-career loop in generate_career_recommendations.
+    """
+
+    def __init__(self, careers):
+        self.career_names = list(careers.keys())
+        self.profiles = [careers[name] for name in self.career_names]
+
+        traits = []
+        trait_index = {}
+        for profile in self.profiles:
+            for trait in profile:
+                if trait in PROFILE_META_KEYS or trait in trait_index:
+                    continue
+                trait_index[trait] = len(traits)
+                traits.append(trait)
+        self.traits = traits
+        self.trait_index = trait_index
+
+        weights = np.zeros((len(self.profiles), len(traits)), dtype=np.float64)
+        presence = np.zeros_like(weights)
+        for row, profile in enumerate(self.profiles):
+            for trait, weight in profile.items():
+                if trait in PROFILE_META_KEYS:
+                    continue
+                weights[row, trait_index[trait]] = weight
+                presence[row, trait_index[trait]] = 1
+        self.weights = weights
+        self.presence = presence
+        self.max_scores = weights.sum(axis=1) * 3
+
+        # Inverted index: careers that carry each trait
+        self.trait_careers = [np.flatnonzero(presence[:, index]) for index in range(len(traits))]
+        # Careers scored as a constant regardless of answers
+        self.constant_careers = np.flatnonzero(self.max_scores == 0)
+
+        # Dense trait-match row per distinct answer value, addressed by value id.
+        # (ids, rows) is replaced as a whole, so readers never see an id
+        # without its row; only _lookup swaps it, under the lock.
+        self._values = ({}, np.zeros((0, len(traits)), dtype=np.float64))
+        self._lock = threading.Lock()
+
+    def match_row(self, value):
+        """Trait-match row for one answer value: 1 per exact match, 0.5 per substring match"""
+        is_str = isinstance(value, str)
+        text = value if is_str else str(value)
+        row = np.zeros(len(self.traits), dtype=np.float64)
+        for trait, index in self.trait_index.items():
+            if is_str and text == trait:
+                row[index] = 1
+            elif trait in text:  # Partial match
+                row[index] = 0.5
+        return row
+
+    def _lookup(self, value):
+        """Return (value id, row) for an answer value, caching its row when possible.
+
+        Values matching no trait and new values once MAX_CACHED_VALUES are
+        cached get a None id: arbitrary client strings never grow the cache.
+        """
+        key = (isinstance(value, str), value if isinstance(value, str) else str(value))
+        value_ids, value_rows = self._values
+        value_id = value_ids.get(key)
+        if value_id is not None:
+            return value_id, value_rows[value_id]
+
+        row = self.match_row(value)
+        if not row.any():
+            return None, row
+        with self._lock:
+            value_ids, value_rows = self._values
+            value_id = value_ids.get(key)
+            if value_id is None:
+                if len(value_ids) >= MAX_CACHED_VALUES:
+                    return None, row
+                value_id = len(value_ids)
+                self._values = ({**value_ids, key: value_id}, np.vstack([value_rows, row]))
+        return value_id, row
+
+    def value_rows(self, values):
+        """Return the encoded trait-match rows for a list of answer values"""
+        rows = np.zeros((len(values), len(self.traits)), dtype=np.float64)
+        for index, value in enumerate(values):
+            rows[index] = self._lookup(value)[1]
+        return rows
+
+    def encode(self, answers):
+        """Encode one answers dict into a trait-match vector"""
+        return self.encode_batch([answers])[0]
+
+    def encode_batch(self, answer_sets):
+        """Encode a sequence of answers dicts into a (batch x trait) matrix"""
+        value_ids = self._values[0]
+        rows = []
+        ids = []
+        uncached = []
+        for row, answers in enumerate(answer_sets):
+            for answer_value in answers.values():
+                value_id = value_ids.get((True, answer_value)) if isinstance(answer_value, str) else None
+                if value_id is None:
+                    value_id, value_row = self._lookup(answer_value)
+                    if value_id is None:
+                        uncached.append((row, value_row))
+                        continue
+                rows.append(row)
+                ids.append(value_id)
+
+        # Ids only ever get appended, so the latest rows cover every id collected above
+        value_rows = self._values[1]
+        n_values = len(value_rows)
+        counts = np.bincount(
+            np.asarray(rows, dtype=np.intp) * n_values + np.asarray(ids, dtype=np.intp),
+            minlength=len(answer_sets) * n_values
+        ).reshape(len(answer_sets), n_values)
+        encoded = counts @ value_rows
+        for row, value_row in uncached:
+            encoded[row] += value_row
+        return encoded
+
+    def score_matrix(self, encoded, careers=None):
+        """Return the (batch x career) percentage score matrix for encoded answers
+
+        Pass an array of career indices to score only those columns.
+        """
+        encoded = np.atleast_2d(encoded)
+        weights, presence, max_scores = self.weights, self.presence, self.max_scores
+        if careers is not None:
+            weights, presence, max_scores = weights[careers], presence[careers], max_scores[careers]
+        raw = (encoded * 3) @ weights.T
+        match_counts = encoded @ presence.T
+
+        # Apply bonus for multiple matches (synergy bonus)
+        bonus = np.ones_like(raw)
+        for threshold, multiplier in reversed(SYNERGY_BONUSES):
+            bonus[match_counts >= threshold] = multiplier
+        raw = raw * bonus
+
+        # Normalize score to percentage
+        has_traits = max_scores > 0
+        safe_max = np.where(has_traits, max_scores, 1)
+        scores = np.where(has_traits, np.minimum(100, (raw / safe_max) * 100), DEFAULT_SCORE)
+
+        # Ensure minimum variance in scores
+        scores = np.where(
+            scores < MIN_SCORE,
+            np.maximum(MIN_SCORE, scores + match_counts * 5),
+            scores
+        )
+        return round_scores(scores)
+
+    def rank(self, scores, top_n=TOP_N):
+        """Return (career indices, scores) of the top_n careers for each row"""
+        scores = np.atleast_2d(scores)
+        # Stable sort keeps catalog order between equal scores
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :top_n]
+        return order, np.take_along_axis(scores, order, axis=1)
+
+    def score_batch(self, answer_sets, top_n=TOP_N):
+        """Score many answers dicts at once, returning ranked (indices, scores)"""
+        return self.rank(self.score_matrix(self.encode_batch(answer_sets)), top_n)
+
+    def build_recommendations(self, indices, scores):
+        """Build recommendation dicts for one ranked row"""
+        recommendations = []
+        for index, score in zip(indices.tolist(), scores.tolist()):
+            profile = self.profiles[index]
+            recommendations.append({
+                'career': self.career_names[index],
+                'score': score,
+                'description': profile['description'],
+                'details': profile['details']
+            })
+        return recommendations
+
+    def recommend_batch(self, answer_sets, top_n=TOP_N):
+        """Return the top_n recommendation dicts for each answers dict"""
+        order, scores = self.score_batch(answer_sets, top_n)
+        return [self.build_recommendations(order[row], scores[row]) for row in range(len(order))]
+
+    def score_indexed(self, answers, top_n=TOP_N):
+        """Rank one answers dict visiting only careers that share a trait with it
+
+        Careers without any matching trait always land on the MIN_SCORE floor,
+        so they only need to be enumerated (in catalog order) to fill the
+        remaining slots. The result is identical to the dense score_batch.
+        """
+        encoded = self.encode(answers)
+        matched_traits = np.flatnonzero(encoded)
+        candidates = [self.trait_careers[index] for index in matched_traits.tolist()]
+        candidates.append(self.constant_careers)
+        candidates = np.unique(np.concatenate(candidates))
+        scores = self.score_matrix(encoded, candidates)[0]
+
+        fillers = []
+        if len(candidates) < len(self.career_names):
+            skip = set(candidates.tolist())
+            for index in range(len(self.career_names)):
+                if index not in skip:
+                    fillers.append(index)
+                    if len(fillers) == top_n:
+                        break
+
+        indices = np.concatenate([candidates, np.array(fillers, dtype=candidates.dtype)])
+        scores = np.concatenate([scores, np.full(len(fillers), float(MIN_SCORE))])
+        # Highest score first, catalog order between equal scores
+        order = np.lexsort((indices, -scores))[:top_n]
+        return indices[order], scores[order]
+
+    def recommend(self, answers, top_n=TOP_N):
+        """Return the top_n recommendation dicts for a single answers dict"""
+        if len(self.career_names) < INDEXED_MIN_CAREERS:
+            order, scores = self.score_batch([answers], top_n)
+            return self.build_recommendations(order[0], scores[0])
+        return self.build_recommendations(*self.score_indexed(answers, top_n))
+
+
+def round_scores(scores):
+    """Round scores to one decimal exactly like the builtin round()"""
+    rounded = np.round(scores, 1)
+    # np.round scales by 10 before rounding, which can disagree with the
+    # correctly-rounded builtin on values sitting right at a .x5 boundary
+    scaled = scores * 10
+    ambiguous = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ambiguous.any():
+        rounded[ambiguous] = [round(value, 1) for value in scores[ambiguous].tolist()]
+    return rounded
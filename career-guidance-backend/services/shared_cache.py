@@ -0,0 +1,224 @@
+import hashlib
+import mmap
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from sqlalchemy.engine import make_url
+
+try:
+    import fcntl
+except ImportError:  # Windows: generations are still shared, bumps are only serialized per process
+    fcntl = None
+
+# Named generations; everything cached from the same data is tagged with one of these
+QUESTIONS = 'questions'
+CATALOG = 'catalog'
+RECOMMENDATIONS = 'recommendations'
+
+# Slots reserved for named generations; keyed generations (one per user) hash into the rest
+NAMED_SLOTS = 64
+_SLOT = struct.Struct('<Q')
+
+
+def default_path(app):
+    """Per-database cache directory in the system temp dir, shared by every process on the node.
+
+    Relative SQLite paths are resolved the way Flask-SQLAlchemy opens them,
+    against the app's instance folder, so two deployments that both use
+    `sqlite:///app.db` get separate directories. An in-memory database is
+    keyed on the instance folder.
+    """
+    database_uri = app.config['SQLALCHEMY_DATABASE_URI']
+    url = make_url(database_uri)
+    if url.drivername.startswith('sqlite'):
+        database = url.database or ':memory:'
+        if database == ':memory:':
+            database_uri = app.instance_path
+        else:
+            if url.query.get('uri'):
+                database = database[len('file:'):]
+            database_uri = os.path.abspath(os.path.join(app.instance_path, database))
+    digest = hashlib.sha256(database_uri.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f'career-guidance-cache-{digest}')
+
+
+class SharedCache:
+    """Node-local cache state shared by every worker process and CLI command.
+
+    Generation counters live in a small memory-mapped file, so reading one
+    is a memory access and an admin write bumps it once for every process
+    on the node. Anything cached from the same data records the generation
+    it was built at and is rebuilt when the counter has moved. Serialized
+    payloads live in a SQLite file next to it, keyed by name and
+    generation, so the first worker to rebuild a payload does so for all
+    of them. Per-key generations (per user) hash into a fixed number of
+    slots; a collision only causes a spurious rebuild.
+
+    With `path=None` the counters are an anonymous shared mapping (still
+    shared with workers forked after init_app, not with other commands)
+    and payloads stay in process memory.
+    """
+
+    def __init__(self, path=None, slots=4096):
+        self.path = path
+        self.slots = slots
+        self._map = None
+        self._fd = None
+        self._memory = {}  # name -> (generation, value) when path is None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.bumps = 0
+
+    def init_app(self, app):
+        self.slots = max(app.config.get('SHARED_CACHE_SLOTS', self.slots), NAMED_SLOTS * 2)
+        if app.config.get('SHARED_CACHE_ENABLED', True):
+            self.path = app.config.get('SHARED_CACHE_PATH') or default_path(app)
+        else:
+            self.path = None
+        self.open()
+        app.extensions['shared_cache'] = self
+
+    def open(self):
+        """Map the generation counters and reset the payload connection"""
+        size = self.slots * _SLOT.size
+        if self._map is not None:
+            self._map.close()
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = None
+        self._memory = {}
+        self._local = threading.local()
+
+        if self.path is None:
+            self._map = mmap.mmap(-1, size)
+            return
+        os.makedirs(self.path, exist_ok=True)
+        self._fd = os.open(os.path.join(self.path, 'generations'), os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            # A file grown by another process keeps its counters; only the new slots are zeroed
+            self._lock_range(0, 0, fcntl.LOCK_EX if fcntl else None)
+            try:
+                if os.fstat(self._fd).st_size < size:
+                    os.ftruncate(self._fd, size)
+            finally:
+                self._lock_range(0, 0, fcntl.LOCK_UN if fcntl else None)
+        self._map = mmap.mmap(self._fd, size)
+
+    def _lock_range(self, offset, length, command):
+        if fcntl is not None and self._fd is not None and command is not None:
+            # POSIX record locks belong to the process, so forked workers never share them
+            fcntl.lockf(self._fd, command, length, offset)
+
+    def _slot(self, name, key=None):
+        if key is None:
+            return zlib.crc32(name.encode()) % NAMED_SLOTS
+        return NAMED_SLOTS + zlib.crc32(f'{name}:{key}'.encode()) % (self.slots - NAMED_SLOTS)
+
+    def generation(self, name, key=None):
+        """Current generation of a name (or of one key under it)"""
+        if self._map is None:
+            self.open()
+        # Counters only grow, so a torn read can only cause an extra rebuild
+        return _SLOT.unpack_from(self._map, self._slot(name, key) * _SLOT.size)[0]
+
+    def bump(self, name, key=None):
+        """Invalidate everything cached at the current generation; return the new one"""
+        if self._map is None:
+            self.open()
+        offset = self._slot(name, key) * _SLOT.size
+        with self._lock:
+            self._lock_range(offset, _SLOT.size, fcntl.LOCK_EX if fcntl else None)
+            try:
+                generation = _SLOT.unpack_from(self._map, offset)[0] + 1
+                _SLOT.pack_into(self._map, offset, generation)
+            finally:
+                self._lock_range(offset, _SLOT.size, fcntl.LOCK_UN if fcntl else None)
+            self.bumps += 1
+        return generation
+
+    def _connection(self):
+        pid = os.getpid()
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != pid:
+            # Never reuse a connection opened before a fork
+            connection = sqlite3.connect(os.path.join(self.path, 'payloads.db'), timeout=5,
+                                         isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute('CREATE TABLE IF NOT EXISTS payload ('
+                               'name TEXT PRIMARY KEY, generation INTEGER NOT NULL, '
+                               'value BLOB NOT NULL, stored_at REAL NOT NULL)')
+            self._local.connection, self._local.pid = connection, pid
+        return connection
+
+    def get(self, name, generation):
+        """Return the payload stored for name at this generation, or None"""
+        if self.path is None:
+            entry = self._memory.get(name)
+            value = entry[1] if entry and entry[0] == generation else None
+        else:
+            row = self._connection().execute(
+                'SELECT value FROM payload WHERE name = ? AND generation = ?', (name, generation)
+            ).fetchone()
+            value = row[0] if row else None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, name, generation, value):
+        """Store a payload built at generation, unless a newer one is already stored"""
+        if self.path is None:
+            with self._lock:
+                entry = self._memory.get(name)
+                if entry is None or entry[0] <= generation:
+                    self._memory[name] = (generation, value)
+            return
+        self._connection().execute(
+            'INSERT INTO payload (name, generation, value, stored_at) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (name) DO UPDATE SET generation = excluded.generation, value = excluded.value, '
+            'stored_at = excluded.stored_at WHERE excluded.generation >= payload.generation',
+            (name, generation, value, time.time())
+        )
+
+    def clear(self):
+        """Bump every named generation and drop all payloads, e.g. after the database was replaced"""
+        for name in (QUESTIONS, CATALOG, RECOMMENDATIONS):
+            self.bump(name)
+        with self._lock:
+            self._memory.clear()
+        if self.path is not None:
+            self._connection().execute('DELETE FROM payload')
+
+    def stats(self):
+        payloads = (len(self._memory) if self.path is None else
+                    self._connection().execute('SELECT count(*) FROM payload').fetchone()[0])
+        return {
+            'path': self.path,
+            'slots': self.slots,
+            'generations': {name: self.generation(name) for name in (QUESTIONS, CATALOG)},
+            'payloads': payloads,
+            'hits': self.hits,
+            'misses': self.misses,
+            'bumps': self.bumps
+        }
+
+    def metrics_lines(self):
+        """Prometheus exposition lines for RequestMetrics.register_collector"""
+        lines = ['# HELP shared_cache_generation Current generation of each shared cache namespace.',
+                 '# TYPE shared_cache_generation gauge']
+        for name in (QUESTIONS, CATALOG):
+            lines.append(f'shared_cache_generation{{name="{name}"}} {self.generation(name)}')
+        lines += ['# HELP shared_cache_events_total Shared payload lookups and generation bumps by this process.',
+                  '# TYPE shared_cache_events_total counter']
+        for event in ('hits', 'misses', 'bumps'):
+            lines.append(f'shared_cache_events_total{{event="{event}"}} {getattr(self, event)}')
+        return lines
+
+
+shared_cache = SharedCache()
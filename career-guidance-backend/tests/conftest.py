@@ -0,0 +1,20 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """The app on a freshly initialized scratch SQLite database, caches warmed as in production"""
+    database = tmp_path_factory.mktemp('database') / 'app.db'
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+    os.environ['RATELIMIT_ENABLED'] = 'false'
+
+    from main import create_app, init_database, warm_caches
+    app = create_app()
+    init_database(app)
+    warm_caches(app)
+    return app
@@ -0,0 +1,11 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from query_budgets import check_query_budgets
+
+
+def test_routes_stay_within_query_budgets(app):
+    problems = [f'{endpoint}: {problem}' for endpoint, _, _, problem in check_query_budgets(app) if problem]
+    assert problems == [], '\n'.join(problems)
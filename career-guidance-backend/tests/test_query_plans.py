@@ -0,0 +1,12 @@
+import pytest
+from services.query_plans import explain, plan_problems, route_queries
+
+ROUTE_QUERIES = route_queries()
+
+
+@pytest.mark.parametrize('route, statement, ordered_listing', ROUTE_QUERIES,
+                         ids=[route for route, _, _ in ROUTE_QUERIES])
+def test_route_query_uses_an_index(app, route, statement, ordered_listing):
+    with app.app_context():
+        plan = explain(statement)
+    assert plan_problems(plan, ordered_listing) == [], '\n'.join(plan)
@@ -0,0 +1,13 @@
+"""WSGI entry point for production servers.
+
+    flask --app main db init      # once per deploy: schema, migrations, default data
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Building the app does not touch the database. warm_caches() loads the
+catalog, question and lookup-table caches; with preload_app this runs once
+in the gunicorn master and every forked worker starts with them in memory.
+"""
+from main import create_app, warm_caches
+
+app = create_app()
+warm_caches(app)